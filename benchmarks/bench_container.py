@@ -0,0 +1,69 @@
+from dipin.container import Container
+from dipin.resolver import Resolver
+
+from .harness import benchmark
+
+SIZE = 5000
+
+
+def populated() -> tuple[Container, list[type]]:
+    container = Container()
+    types = [type(f"Service{i}", (), {}) for i in range(SIZE)]
+    for i, type_ in enumerate(types):
+        container.register_factory(type_)
+        container.register_factory(type_, name=f"tenant-{i}")
+
+    return container, types
+
+
+@benchmark("container", f"lookup by type ({SIZE * 2} items)", number=10000)
+def lookup_by_type():
+    container, types = populated()
+    type_ = types[SIZE // 2]
+    return lambda: container.lookup(type_)
+
+
+@benchmark("container", f"lookup by name ({SIZE * 2} items)", number=10000)
+def lookup_by_name():
+    container, _ = populated()
+    name = f"tenant-{SIZE // 2}"
+    return lambda: container.lookup(name)
+
+
+@benchmark("container", f"register named ({SIZE * 2} items)", number=100)
+def register_named():
+    container, _ = populated()
+    type_ = type("Extra", (), {})
+
+    def register():
+        container.container.pop((type_, "extra"), None)
+        container.register_factory(type_, name="extra")
+
+    return register
+
+
+@benchmark("container", f"create child ({SIZE * 2} items)", number=10000)
+def create_child():
+    container, _ = populated()
+    return container.child
+
+
+@benchmark("container", f"create child and resolve ({SIZE * 2} items)", number=10000)
+def create_child_and_resolve():
+    container, types = populated()
+    resolver = Resolver(container)
+    key = (types[SIZE // 2], None)
+
+    def resolve():
+        child = container.child()
+        return resolver.child(child).get(key)
+
+    return resolve
+
+
+@benchmark("container", f"child lookup by type ({SIZE * 2} items)", number=10000)
+def child_lookup_by_type():
+    container, types = populated()
+    child = container.child()
+    type_ = types[SIZE // 2]
+    return lambda: child.lookup(type_)
@@ -0,0 +1,113 @@
+from typing import Annotated
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from dipin.interface import FastAPIContainer
+
+from .harness import benchmark
+
+
+class Service: ...
+
+
+class DependentService:
+    def __init__(self, service: Service):
+        self.service = service
+
+
+def request(app: FastAPI):
+    client = TestClient(app)
+    return lambda: client.get("/")
+
+
+@benchmark("fastapi", "plain Depends", number=200)
+def plain_depends():
+    def get_service() -> Service:
+        return Service()
+
+    def get_dependent(
+        service: Annotated[Service, Depends(get_service)],
+    ) -> DependentService:
+        return DependentService(service)
+
+    app = FastAPI()
+
+    @app.get("/")
+    async def handler(svc: Annotated[DependentService, Depends(get_dependent)]):
+        return None
+
+    return request(app)
+
+
+@benchmark("fastapi", "DI[...] factories", number=200)
+def di_factories():
+    DI = FastAPIContainer()
+    DI.register_factory(Service)
+    DI.register_factory(DependentService)
+
+    app = FastAPI()
+
+    @app.get("/")
+    async def handler(svc: DI[DependentService]):
+        return None
+
+    return request(app)
+
+
+@benchmark("fastapi", "DI[...] native factories", number=200)
+def di_native_factories():
+    DI = FastAPIContainer(native=True)
+    DI.register_factory(Service)
+    DI.register_factory(DependentService)
+
+    app = FastAPI()
+
+    @app.get("/")
+    async def handler(svc: DI[DependentService]):
+        return None
+
+    return request(app)
+
+
+@benchmark("fastapi", "DI[...] create_once", number=200)
+def di_singleton():
+    DI = FastAPIContainer()
+    DI.register_factory(Service, create_once=True)
+    DI.register_factory(DependentService, create_once=True)
+
+    app = FastAPI()
+
+    @app.get("/")
+    async def handler(svc: DI[DependentService]):
+        return None
+
+    return request(app)
+
+
+@benchmark("fastapi", "DI[...] frozen singleton", number=200)
+def di_frozen_singleton():
+    DI = FastAPIContainer()
+    DI.register_factory(Service, create_once=True)
+    DI.register_factory(DependentService, create_once=True)
+    DI.warmup()
+    DI.freeze()
+
+    app = FastAPI()
+
+    @app.get("/")
+    async def handler(svc: DI[DependentService]):
+        return None
+
+    return request(app)
+
+
+@benchmark("fastapi", "no dependencies", number=200)
+def no_dependencies():
+    app = FastAPI()
+
+    @app.get("/")
+    async def handler():
+        return None
+
+    return request(app)
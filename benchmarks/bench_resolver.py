@@ -0,0 +1,135 @@
+from dipin.container import Container
+from dipin.resolver import Resolver
+
+from .graphs import chain, fan_out
+from .harness import benchmark
+
+
+class Service: ...
+
+
+def resolver_for(root_builder, size: int) -> tuple[Resolver, type]:
+    container = Container()
+    root = root_builder(container, size)
+    return Resolver(container), root
+
+
+@benchmark("resolver", "get shallow")
+def get_shallow():
+    resolver, root = resolver_for(chain, 1)
+    return lambda: resolver.get((root, None))
+
+
+@benchmark("resolver", "get deep (depth 50)", number=100)
+def get_deep():
+    resolver, root = resolver_for(chain, 50)
+    return lambda: resolver.get((root, None))
+
+
+@benchmark("resolver", "get wide (width 50)", number=100)
+def get_wide():
+    resolver, root = resolver_for(fan_out, 50)
+    return lambda: resolver.get((root, None))
+
+
+@benchmark("resolver", "aget deep (depth 50)", number=100)
+def aget_deep():
+    resolver, root = resolver_for(chain, 50)
+
+    async def resolve():
+        return await resolver.aget((root, None))
+
+    return resolve
+
+
+@benchmark("resolver", "aget wide concurrent (width 50)", number=100)
+def aget_wide_concurrent():
+    resolver, root = resolver_for(fan_out, 50)
+    resolver.concurrent = True
+
+    async def resolve():
+        return await resolver.aget((root, None))
+
+    return resolve
+
+
+def factory_resolver(factory, create_once: bool = False) -> Resolver:
+    container = Container()
+    container.register_factory(Service, factory, create_once=create_once)
+    return Resolver(container)
+
+
+def create_service() -> Service:
+    return Service()
+
+
+async def acreate_service() -> Service:
+    return Service()
+
+
+def generate_service():
+    yield Service()
+
+
+async def agenerate_service():
+    yield Service()
+
+
+@benchmark("factories", "sync factory via aget")
+def sync_factory():
+    resolver = factory_resolver(create_service)
+
+    async def resolve():
+        return await resolver.aget((Service, None))
+
+    return resolve
+
+
+@benchmark("factories", "async factory via aget")
+def async_factory():
+    resolver = factory_resolver(acreate_service)
+
+    async def resolve():
+        return await resolver.aget((Service, None))
+
+    return resolve
+
+
+@benchmark("factories", "generator factory via aget")
+def generator_factory():
+    resolver = factory_resolver(generate_service)
+
+    async def resolve():
+        return await resolver.aget((Service, None))
+
+    return resolve
+
+
+@benchmark("factories", "async generator factory via aget")
+def async_generator_factory():
+    resolver = factory_resolver(agenerate_service)
+
+    async def resolve():
+        return await resolver.aget((Service, None))
+
+    return resolve
+
+
+@benchmark("caching", "uncached factory")
+def uncached():
+    resolver = factory_resolver(create_service)
+    return lambda: resolver.get((Service, None))
+
+
+@benchmark("caching", "create_once factory", number=10000)
+def cached():
+    resolver = factory_resolver(create_service, create_once=True)
+    return lambda: resolver.get((Service, None))
+
+
+@benchmark("caching", "create_once factory, frozen", number=10000)
+def frozen():
+    resolver = factory_resolver(create_service, create_once=True)
+    resolver.get((Service, None))
+    resolver.container.freeze()
+    return lambda: resolver.get((Service, None))
@@ -0,0 +1,47 @@
+import inspect
+
+from dipin.container import Container
+
+
+def chain(container: Container, depth: int) -> type:
+    """Register a chain of classes each depending on the next, returning the root"""
+
+    dependency = type("Leaf", (), {})
+    container.register_factory(dependency)
+
+    for i in range(depth):
+        dependency = type(f"Level{i}", (), {"__init__": initialiser(dep=dependency)})
+        container.register_factory(dependency)
+
+    return dependency
+
+
+def fan_out(container: Container, width: int) -> type:
+    """Register a class depending on many independent classes, returning it"""
+
+    leaves = [type(f"Leaf{i}", (), {}) for i in range(width)]
+    for leaf in leaves:
+        container.register_factory(leaf)
+
+    root = type(
+        "Root",
+        (),
+        {"__init__": initialiser(**{f"dep{i}": leaf for i, leaf in enumerate(leaves)})},
+    )
+    container.register_factory(root)
+
+    return root
+
+
+def initialiser(**dependencies: type):
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+    __init__.__signature__ = inspect.Signature(
+        [inspect.Parameter("self", inspect.Parameter.POSITIONAL_ONLY)]
+        + [
+            inspect.Parameter(name, inspect.Parameter.KEYWORD_ONLY, annotation=type_)
+            for name, type_ in dependencies.items()
+        ]
+    )
+    return __init__
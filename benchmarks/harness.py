@@ -0,0 +1,97 @@
+import inspect
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+
+import anyio
+
+Operation = Callable[[], object] | Callable[[], Awaitable[object]]
+Setup = Callable[[], Operation]
+
+
+@dataclass
+class Benchmark:
+    group: str
+    name: str
+    setup: Setup
+    # Operations per timed round; slower operations should use fewer
+    number: int
+
+
+@dataclass
+class Result:
+    group: str
+    name: str
+    number: int
+    rounds: int
+    # Seconds per operation
+    best: float
+    median: float
+    mean: float
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+benchmarks: list[Benchmark] = []
+
+
+def benchmark(group: str, name: str, number: int = 1000):
+    """Register a setup function, which returns the operation to time"""
+
+    def decorator(setup: Setup) -> Setup:
+        benchmarks.append(Benchmark(group, name, setup, number))
+        return setup
+
+    return decorator
+
+
+def run(benchmark: Benchmark, rounds: int) -> Result:
+    operation = benchmark.setup()
+    number = benchmark.number
+
+    if inspect.iscoroutinefunction(operation):
+        timings = anyio.run(time_async, operation, number, rounds)
+    else:
+        timings = time_sync(operation, number, rounds)
+
+    per_op = [timing / number for timing in timings]
+    return Result(
+        group=benchmark.group,
+        name=benchmark.name,
+        number=number,
+        rounds=rounds,
+        best=min(per_op),
+        median=statistics.median(per_op),
+        mean=statistics.fmean(per_op),
+    )
+
+
+def time_sync(operation: Callable[[], object], number: int, rounds: int) -> list[float]:
+    # Warm caches and compiled plans before timing
+    operation()
+
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(number):
+            operation()
+        timings.append(time.perf_counter() - started)
+
+    return timings
+
+
+async def time_async(
+    operation: Callable[[], Awaitable[object]], number: int, rounds: int
+) -> list[float]:
+    await operation()
+
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(number):
+            await operation()
+        timings.append(time.perf_counter() - started)
+
+    return timings
@@ -0,0 +1,81 @@
+"""Run the benchmark suite, optionally saving results as JSON
+
+python -m benchmarks.run --output results.json
+python -m benchmarks.run --compare baseline.json
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+
+from . import bench_container, bench_fastapi, bench_resolver  # noqa: F401
+from .harness import Result, benchmarks, run
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Compare against a previous JSON file")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--filter", help="Only run benchmarks containing this text")
+    args = parser.parse_args(argv)
+
+    results = []
+    for bench in benchmarks:
+        if args.filter and args.filter not in f"{bench.group} {bench.name}":
+            continue
+
+        result = run(bench, args.rounds)
+        results.append(result)
+        print(f"{result.group:<10} {result.name:<45} {format_time(result.best)}")
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": [result.as_dict() for result in results],
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+
+    return 0
+
+
+def compare(baseline: dict, results: list[Result]):
+    previous = {(r["group"], r["name"]): r["best"] for r in baseline["results"]}
+
+    print(f"\nCompared to {baseline.get('commit') or 'baseline'}:")
+    for result in results:
+        if (before := previous.get((result.group, result.name))) is None:
+            continue
+
+        change = (result.best - before) / before * 100
+        print(f"{result.group:<10} {result.name:<45} {change:+.1f}%")
+
+
+def format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f}{unit}"
+    return f"{seconds / 1e-9:.0f}ns"
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    sys.exit(main())
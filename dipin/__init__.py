@@ -2,9 +2,10 @@ __version__ = "0.0.3"
 
 from .container import Container
 from .interface import FastAPIContainer
+from .lazy import Lazy
 from .resolver import CircularDependencyError
 
-__all__ = ["DI", "Container", "CircularDependencyError"]
+__all__ = ["DI", "Container", "CircularDependencyError", "Lazy"]
 
 
 DI = FastAPIContainer()
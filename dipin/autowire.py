@@ -0,0 +1,56 @@
+import inspect
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+from dipin.container import InstanceType
+
+if TYPE_CHECKING:
+    from dipin.resolver import UnfillableArgumentError
+
+
+class AutowirePolicy:
+    """Decides which unregistered types can be constructed by autowiring
+
+    Only concrete classes are autowired, excluding builtins, abstract classes
+    and protocols. Given modules, only classes from those modules or their
+    submodules are autowired. Decisions are remembered for each type.
+    """
+
+    modules: tuple[str, ...] | None
+    decisions: dict[InstanceType, bool]
+    failures: dict[InstanceType, "UnfillableArgumentError"]
+
+    def __init__(self, modules: Iterable[str] | None = None):
+        self.modules = None if modules is None else tuple(modules)
+        self.decisions = {}
+        # Eligible classes whose parameters can't be filled, by the resolver
+        self.failures = {}
+
+    def can_autowire(self, type_: InstanceType) -> bool:
+        try:
+            return self.decisions[type_]
+        except KeyError:
+            decision = self.decisions[type_] = self.is_eligible(type_)
+            return decision
+        except TypeError:
+            # Unhashable annotations can't be classes
+            return False
+
+    def is_eligible(self, type_: InstanceType) -> bool:
+        # Rejects aliases like list[X] and Annotated[X, ...], unions and strings
+        if not isinstance(type_, type):
+            return False
+
+        if type_.__module__ == "builtins":
+            return False
+
+        if inspect.isabstract(type_) or getattr(type_, "_is_protocol", False):
+            return False
+
+        if self.modules is not None:
+            return any(
+                type_.__module__ == module or type_.__module__.startswith(module + ".")
+                for module in self.modules
+            )
+
+        return True
@@ -0,0 +1,224 @@
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from contextlib import (
+    AbstractAsyncContextManager,
+    AbstractContextManager,
+    asynccontextmanager,
+    contextmanager,
+)
+from typing import Any, AsyncGenerator, Generator
+
+import asyncer
+
+Clock = Callable[[], float]
+
+
+class CacheEntry:
+    """A cached instance, holding its generator open until it's evicted"""
+
+    __slots__ = ("instance", "created", "context", "refreshing")
+
+    instance: Any
+    created: float
+    context: AbstractContextManager | AbstractAsyncContextManager | None
+    refreshing: bool
+
+    def __init__(self):
+        self.instance = None
+        self.created = 0.0
+        self.context = None
+        self.refreshing = False
+
+    # Matches Scope, so the resolver can enter generators into either
+    def enter_generator(self, generator: Generator, on_exit: Any = None) -> Any:
+        return self.enter_context(contextmanager(lambda: generator)())
+
+    async def enter_async_generator(
+        self, generator: AsyncGenerator, on_exit: Any = None
+    ) -> Any:
+        return await self.enter_async_context(asynccontextmanager(lambda: generator)())
+
+    def enter_context(
+        self, context: AbstractContextManager, on_exit: Any = None
+    ) -> Any:
+        instance = context.__enter__()
+        self.context = context
+        return instance
+
+    async def enter_async_context(
+        self, context: AbstractAsyncContextManager, on_exit: Any = None
+    ) -> Any:
+        instance = await context.__aenter__()
+        self.context = context
+        return instance
+
+    def close(self):
+        context, self.context = self.context, None
+        if isinstance(context, AbstractAsyncContextManager):
+            asyncer.syncify(context.__aexit__)(None, None, None)
+        elif context is not None:
+            context.__exit__(None, None, None)
+
+    async def aclose(self):
+        context, self.context = self.context, None
+        if isinstance(context, AbstractAsyncContextManager):
+            await context.__aexit__(None, None, None)
+        elif context is not None:
+            context.__exit__(None, None, None)
+
+    def finalize(self):
+        """Tear down the instance from sync code, as afinalize() does
+
+        A sync close() is preferred, as aclose() is awaited on the event loop.
+        """
+
+        if self.context is not None:
+            return self.close()
+
+        close = getattr(self.instance, "close", None)
+        if callable(close) and not inspect.iscoroutinefunction(close):
+            close()
+        elif callable(close) or callable(getattr(self.instance, "aclose", None)):
+            asyncer.syncify(self.afinalize)()
+
+    async def afinalize(self):
+        """Tear down the instance, closing it if its factory had no teardown"""
+
+        if self.context is not None:
+            return await self.aclose()
+
+        if callable(aclose := getattr(self.instance, "aclose", None)):
+            result = aclose()
+        elif callable(close := getattr(self.instance, "close", None)):
+            result = close()
+        else:
+            return
+
+        if inspect.isawaitable(result):
+            await result
+
+
+class CachePolicy:
+    """Caches a factory's instances, evicting the least recently used over maxsize
+
+    A policy can be shared between registrations to bound them together, e.g.
+    one client per tenant. Evicted entries are queued, and finalized by the
+    resolver.
+    """
+
+    maxsize: int | None
+    clock: Clock
+    entries: OrderedDict[Hashable, CacheEntry]
+    evicted: list[CacheEntry]
+    lock: threading.Lock
+
+    def __init__(self, maxsize: int | None = None, clock: Clock = time.monotonic):
+        self.maxsize = maxsize
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.evicted = []
+        self.lock = threading.Lock()
+
+    def get(self, key: Hashable) -> CacheEntry | None:
+        with self.lock:
+            if (entry := self.entries.get(key)) is None:
+                return None
+
+            if self.is_expired(entry):
+                del self.entries[key]
+                self.evicted.append(entry)
+                return None
+
+            self.entries.move_to_end(key)
+            return entry
+
+    def set(self, key: Hashable, entry: CacheEntry):
+        entry.created = self.clock()
+        with self.lock:
+            if (previous := self.entries.pop(key, None)) is not None:
+                self.evicted.append(previous)
+            self.entries[key] = entry
+
+            if self.maxsize is not None:
+                while len(self.entries) > self.maxsize:
+                    self.evicted.append(self.entries.popitem(last=False)[1])
+
+    def is_expired(self, entry: CacheEntry) -> bool:
+        return False
+
+    def should_refresh(self, entry: CacheEntry) -> bool:
+        """Whether to rebuild the entry in the background, claiming the refresh"""
+
+        return False
+
+    def pop_evicted(self) -> list[CacheEntry]:
+        with self.lock:
+            evicted, self.evicted = self.evicted, []
+        return evicted
+
+    def clear(self):
+        with self.lock:
+            self.evicted.extend(self.entries.values())
+            self.entries.clear()
+
+    def evict(self, predicate: Callable[[Hashable], bool]):
+        """Evict the entries whose keys match, e.g. those a child container cached"""
+
+        with self.lock:
+            for key in [key for key in self.entries if predicate(key)]:
+                self.evicted.append(self.entries.pop(key))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class LRU(CachePolicy):
+    def __init__(self, maxsize: int, clock: Clock = time.monotonic):
+        super().__init__(maxsize, clock)
+
+
+class TTL(CachePolicy):
+    """Caches instances for a number of seconds"""
+
+    ttl: float
+
+    def __init__(
+        self, ttl: float, maxsize: int | None = None, clock: Clock = time.monotonic
+    ):
+        super().__init__(maxsize, clock)
+        self.ttl = ttl
+
+    def is_expired(self, entry: CacheEntry) -> bool:
+        return self.clock() - entry.created >= self.ttl
+
+
+class RefreshAhead(TTL):
+    """Caches instances for a number of seconds, rebuilding them before they expire
+
+    Callers keep receiving the cached instance while it's rebuilt.
+    """
+
+    refresh_after: float
+
+    def __init__(
+        self,
+        ttl: float,
+        refresh_after: float | None = None,
+        maxsize: int | None = None,
+        clock: Clock = time.monotonic,
+    ):
+        super().__init__(ttl, maxsize, clock)
+        self.refresh_after = ttl * 0.75 if refresh_after is None else refresh_after
+
+    def should_refresh(self, entry: CacheEntry) -> bool:
+        if entry.refreshing or self.clock() - entry.created < self.refresh_after:
+            return False
+
+        with self.lock:
+            if entry.refreshing:
+                return False
+            entry.refreshing = True
+            return True
@@ -1,7 +1,12 @@
+import inspect
 import warnings
-from dataclasses import dataclass
-from typing import Callable, Type, TypeVar
+from collections import ChainMap
+from collections.abc import MutableMapping
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, ClassVar, Type, TypeVar
 
+from dipin.cache import LRU, CacheEntry, CachePolicy
 from dipin.util import is_class_type
 
 T = TypeVar("T")
@@ -15,35 +20,193 @@ LookupKey = InstanceType | Name
 ContainerKey = tuple[InstanceType, Name | None]
 
 
-@dataclass
-class InstanceContainerItem:
+class ItemKind(Enum):
+    INSTANCE = "instance"
+    FACTORY = "factory"
+
+
+class Execution(Enum):
+    """Where async resolution calls a sync factory"""
+
+    # On the event loop, for factories that don't block
+    INLINE = "inline"
+    # In a worker thread, for blocking I/O
+    THREAD = "thread"
+    # In a worker process, for heavy CPU work. The factory, its dependencies
+    # and the instance must be picklable.
+    PROCESS = "process"
+
+
+# Returned when an instance isn't cached, as None can be cached
+NOT_CACHED = object()
+
+# Instances cached for each keyed factory without a cache policy
+KEYED_CACHE_SIZE = 128
+
+
+@dataclass(slots=True)
+class ContainerItem:
+    """A registration, and the plan the resolver compiled for it"""
+
+    kind: ClassVar[ItemKind]
+    # Replacing the item with Container.set discards its plan with it
+    plan: Any = field(default=None, init=False, repr=False, compare=False)
+
+
+@dataclass(slots=True)
+class InstanceContainerItem(ContainerItem):
     instance: Instance
 
+    kind = ItemKind.INSTANCE
+
 
-@dataclass
-class PartialFactoryContainerItem:
+@dataclass(slots=True)
+class FactoryContainerItem(ContainerItem):
     use_cache: bool
     factory: Factory
+    cache: CachePolicy | None = None
+    # Called with a `key` argument, caching an instance per key
+    keyed: bool = False
+    execution: Execution = Execution.INLINE
+    # Registered on resolution by autowiring, rather than explicitly
+    autowired: bool = False
 
+    kind = ItemKind.FACTORY
 
-@dataclass
-class DefinedFactoryContainerItem:
-    use_cache: bool
-    factory: Factory
 
+@dataclass(slots=True)
+class PartialFactoryContainerItem(FactoryContainerItem): ...
 
-ContainerItem = (
-    InstanceContainerItem | PartialFactoryContainerItem | DefinedFactoryContainerItem
-)
 
+@dataclass(slots=True)
+class DefinedFactoryContainerItem(FactoryContainerItem): ...
+
+
+class Overlay(ChainMap):
+    """Local mapping over a parent's, where writes only change the local mapping"""
+
+    def __init__(self, parent: MutableMapping):
+        super().__init__({}, parent)
+
+    def __getitem__(self, key):
+        local, parent = self.maps
+        if key in local:
+            return local[key]
+        return parent[key]
+
+    def __contains__(self, key) -> bool:
+        local, parent = self.maps
+        return key in local or key in parent
+
+    def get(self, key, default=None):
+        local, parent = self.maps
+        if key in local:
+            return local[key]
+        return parent.get(key, default)
+
+
+class CacheOverlay(Overlay):
+    """Cached instances over the parent's, except those the container caches itself
+
+    Items a child registers, or that depend on its registrations, are built
+    differently than in the parent, so the parent's instances don't apply.
+    """
+
+    def __init__(self, parent: MutableMapping, container: "Container"):
+        super().__init__(parent)
+        self.owner = container
+
+    def __getitem__(self, key):
+        local, parent = self.maps
+        if key in local:
+            return local[key]
+        if self.owner.owns(key):
+            raise KeyError(key)
+        return parent[key]
+
+    def __contains__(self, key) -> bool:
+        local, parent = self.maps
+        return key in local or (key in parent and not self.owner.owns(key))
+
+    def get(self, key, default=None):
+        local, parent = self.maps
+        if key in local:
+            return local[key]
+        if self.owner.owns(key):
+            return default
+        return parent.get(key, default)
+
+    def __iter__(self):
+        local, parent = self.maps
+        yield from local
+        for key in parent:
+            if key not in local and not self.owner.owns(key):
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
 
-class Container:
-    container: dict[ContainerKey, ContainerItem]
-    cache: dict[ContainerKey, Instance]
 
-    def __init__(self):
-        self.container = {}
-        self.cache = {}
+def is_autowired(item: ContainerItem) -> bool:
+    return isinstance(item, FactoryContainerItem) and item.autowired
+
+
+def describe_key(key: ContainerKey) -> str:
+    type_name = ".".join([key[0].__module__, key[0].__qualname__])
+    name = f" (named '{key[1]}')" if key[1] else ""
+    return f"{type_name}{name}"
+
+
+class Container:
+    container: MutableMapping[ContainerKey, ContainerItem]
+    cache: MutableMapping[ContainerKey, Instance]
+    names: MutableMapping[Name, ContainerKey]
+    implementations: MutableMapping[type, list[ContainerKey]]
+    protocols: dict[type, tuple[int, list[ContainerKey]]]
+    parent: "Container | None"
+    registrations: int
+    frozen: bool
+    singletons: dict[ContainerKey, Instance]
+    finalizers: dict[ContainerKey, CacheEntry]
+    localized: set[ContainerKey]
+
+    def __init__(self, parent: "Container | None" = None):
+        # Children overlay their registrations and caches on the parent's, so
+        # lookups fall through, and changes only apply to the child
+        if parent is None:
+            self.container = {}
+            self.cache = {}
+            self.names = {}
+            self.implementations = {}
+        else:
+            self.container = Overlay(parent.container)
+            self.cache = CacheOverlay(parent.cache, self)
+            self.names = Overlay(parent.names)
+            self.implementations = Overlay(parent.implementations)
+        # Registered implementations of runtime-checkable protocols, found on
+        # lookup as they don't subclass them, for the revision they were found
+        self.protocols = {}
+        self.parent = parent
+        self.registrations = 0
+        self.frozen = False
+        # Instances and cached factories, indexed when the container is frozen
+        self.singletons = {}
+        # Teardowns of the instances cached here, run when the container closes
+        self.finalizers = {}
+        # Parent's cached items depending on this container's registrations, so
+        # cached here instead. Found by the resolver.
+        self.localized = set()
+
+    @property
+    def revision(self) -> int:
+        """Changes on each registration, to detect changes since validation"""
+
+        if self.parent is None:
+            return self.registrations
+        return self.registrations + self.parent.revision
+
+    def child(self) -> "Container":
+        return Container(self)
 
     def register_instance(
         self,
@@ -55,7 +218,7 @@ class Container:
             type_ = type(instance)
 
         if name:
-            self._check_for_existing_names(name)
+            self._check_for_existing_names(name, (type_, name))
 
         self.set((type_, name), InstanceContainerItem(instance=instance))
         return type_, name
@@ -66,9 +229,28 @@ class Container:
         factory: Factory | None = None,
         name: Name | None = None,
         create_once: bool = False,
+        cache: CachePolicy | None = None,
+        keyed: bool = False,
+        execution: Execution = Execution.INLINE,
     ) -> ContainerKey:
+        if create_once and cache is not None:
+            raise ValueError("create_once factories cannot have a cache policy")
+
+        if execution is not Execution.INLINE and (
+            inspect.iscoroutinefunction(factory) or inspect.isasyncgenfunction(factory)
+        ):
+            raise ValueError("Async factories run on the event loop")
+        if execution is Execution.PROCESS and inspect.isgeneratorfunction(factory):
+            raise ValueError("Generator factories cannot run in a process")
+
+        if keyed:
+            if create_once:
+                raise ValueError("Keyed factories are cached per key, not create_once")
+            if cache is None:
+                cache = LRU(KEYED_CACHE_SIZE)
+
         if name:
-            self._check_for_existing_names(name)
+            self._check_for_existing_names(name, (type_, name))
 
         if factory is None:
             if not is_class_type(type_):
@@ -77,29 +259,90 @@ class Container:
                 )
             self.set(
                 (type_, name),
-                PartialFactoryContainerItem(factory=type_, use_cache=create_once),
+                PartialFactoryContainerItem(
+                    factory=type_,
+                    use_cache=create_once,
+                    cache=cache,
+                    keyed=keyed,
+                    execution=execution,
+                ),
             )
             return type_, name
 
         self.set(
             (type_, name),
-            DefinedFactoryContainerItem(factory=factory, use_cache=create_once),
+            DefinedFactoryContainerItem(
+                factory=factory,
+                use_cache=create_once,
+                cache=cache,
+                keyed=keyed,
+                execution=execution,
+            ),
         )
         return type_, name
 
+    def register_autowired(self, item: FactoryContainerItem) -> ContainerKey:
+        """Register a class found by autowiring, even once the container is frozen
+
+        Classes are autowired as they're first resolved, which can be while
+        serving requests.
+        """
+
+        key = (item.factory, None)
+        self._set(key, item)
+        return key
+
     def set(self, key: ContainerKey, item: ContainerItem):
-        if key in self.container:
-            type_name = ".".join([key[0].__module__, key[0].__qualname__])
-            name = f" (named '{key[1]}')" if key[1] else ""
+        if self.frozen:
+            raise FrozenContainerError(key)
+        self._set(key, item)
+
+    def _set(self, key: ContainerKey, item: ContainerItem):
+        # Children can replace their parent's items without warning
+        if key in self.own_items():
             warnings.warn(
-                UserWarning(f"Replacing existing container item {type_name}{name}")
+                UserWarning(f"Replacing existing container item {describe_key(key)}")
             )
 
         self.container[key] = item
+        self.registrations += 1
+        if key[1]:
+            self.names[key[1]] = key
+
+        # Collections only include registered items, rather than depend on
+        # which classes were autowired so far
+        if isinstance(key[0], type) and not is_autowired(item):
+            for base in key[0].__mro__:
+                if base is object:
+                    continue
+                # Copied, so children don't change their parent's lists
+                keys = self.implementations.get(base, [])
+                if key not in keys:
+                    self.implementations[base] = [*keys, key]
 
     def get(self, key: ContainerKey) -> ContainerItem:
         return self.container[key]
 
+    def own_items(self) -> MutableMapping[ContainerKey, ContainerItem]:
+        """Items registered in this container, rather than inherited from its parent"""
+
+        if self.parent is None:
+            return self.container
+        return self.container.maps[0]
+
+    def owns(self, key: ContainerKey) -> bool:
+        """Whether the container caches the item itself, rather than its parent"""
+
+        return key in self.own_items() or key in self.localized
+
+    def owner(self, key: ContainerKey) -> "Container":
+        """The container caching the item, shared by its children"""
+
+        container = self
+        while container.parent is not None and not container.owns(key):
+            container = container.parent
+        return container
+
     def lookup(self, key: LookupKey) -> ContainerKey:
         if isinstance(key, Name):
             type_, name = self._find_by_name(key)
@@ -110,27 +353,44 @@ class Container:
 
         return key, None
 
-    def _find_by_name(self, name: str) -> ContainerKey:
-        for type_, item_name in self.container.keys():
-            if item_name == name:
-                return type_, item_name
+    def lookup_all(self, type_: InstanceType) -> list[ContainerKey]:
+        """Keys registered as the type, its subclasses, or implementing the protocol"""
+
+        if not getattr(type_, "_is_runtime_protocol", False):
+            return self.implementations.get(type_, [])
+
+        revision = self.revision
+        if (found := self.protocols.get(type_)) is not None and found[0] == revision:
+            return found[1]
 
-        raise KeyError(f"Container item with name {name} not registered")
+        keys = list(self.implementations.get(type_, []))
+        for key, item in self.container.items():
+            if key in keys or is_autowired(item):
+                continue
+            try:
+                if isinstance(key[0], type) and issubclass(key[0], type_):
+                    keys.append(key)
+            except TypeError:
+                # Protocols with data members don't support issubclass
+                continue
 
-    def _check_for_existing_names(self, name: str):
+        self.protocols[type_] = (revision, keys)
+        return keys
+
+    def _find_by_name(self, name: str) -> ContainerKey:
         try:
-            self._find_by_name(name)
+            return self.names[name]
         except KeyError:
-            # TODO: Handle replacements later
+            raise KeyError(f"Container item with name {name} not registered")
+
+    def _check_for_existing_names(self, name: str, key: ContainerKey):
+        # Re-registering the same type and name replaces the item in set()
+        if self.names.get(name, key) != key:
             raise KeyError(f"Existing container item with name {name}")
 
     def should_cache(self, key: ContainerKey) -> bool:
         item = self.container[key]
-
-        if isinstance(item, InstanceContainerItem):
-            return False
-
-        return item.use_cache
+        return item.kind is ItemKind.FACTORY and item.use_cache
 
     def is_cached(self, key: ContainerKey) -> bool:
         return key in self.cache
@@ -138,8 +398,35 @@ class Container:
     def get_cached(self, key: ContainerKey) -> Instance:
         return self.cache[key]
 
-    def set_cached(self, key: ContainerKey, instance: Instance):
-        self.cache[key] = instance
+    def set_cached(
+        self,
+        key: ContainerKey,
+        instance: Instance,
+        finalizer: CacheEntry | None = None,
+    ):
+        owner = self.owner(key)
+        owner.cache[key] = instance
+        if finalizer is not None:
+            finalizer.instance = instance
+            owner.finalizers[key] = finalizer
+
+    def pop_cached(self, key: ContainerKey) -> CacheEntry | None:
+        """Forget a cached instance, returning its teardown"""
+
+        self.cache.pop(key, None)
+        self.singletons.pop(key, None)
+        return self.finalizers.pop(key, None)
+
+    def freeze(self):
+        """Prevent further registrations, and index the instances built so far"""
+
+        self.frozen = True
+        self.singletons = {
+            key: item.instance
+            for key, item in self.container.items()
+            if isinstance(item, InstanceContainerItem)
+        }
+        self.singletons.update(self.cache)
 
     def __len__(self) -> int:
         return len(self.container)
@@ -149,3 +436,13 @@ class Container:
 
     def __getitem__(self, item: ContainerKey) -> ContainerItem:
         return self.container[item]
+
+
+class FrozenContainerError(RuntimeError):
+    key: ContainerKey
+
+    def __init__(self, key: ContainerKey):
+        self.key = key
+
+    def __str__(self) -> str:
+        return f"Cannot register {self.key}, the container is frozen"
@@ -0,0 +1,79 @@
+from collections.abc import Iterable
+
+from dipin.container import ContainerKey
+
+
+class DependencyGraph:
+    """The keys each container item depends on, as declared by factory signatures"""
+
+    dependencies: dict[ContainerKey, list[ContainerKey]]
+    errors: dict[ContainerKey, Exception]
+
+    def __init__(self):
+        self.dependencies = {}
+        # Items whose dependencies couldn't be determined
+        self.errors = {}
+
+    def add(self, key: ContainerKey, dependencies: list[ContainerKey]):
+        self.dependencies[key] = dependencies
+
+    def find_cycle(self) -> list[ContainerKey] | None:
+        """The first circular path found, starting and ending with the same key"""
+
+        return self._search(self.dependencies)[1]
+
+    def topological_order(
+        self, keys: Iterable[ContainerKey] | None = None
+    ) -> list[ContainerKey]:
+        """Keys (and their dependencies) ordered so each follows its dependencies"""
+
+        return self._search(self.dependencies if keys is None else keys)[0]
+
+    def depths(self) -> dict[ContainerKey, int]:
+        """How far each key is from its furthest leaf dependency"""
+
+        depths: dict[ContainerKey, int] = {}
+        for key in self.topological_order():
+            depths[key] = 1 + max(
+                (depths[dep] for dep in self.dependencies.get(key, ())), default=-1
+            )
+
+        return depths
+
+    def _search(
+        self, roots: Iterable[ContainerKey]
+    ) -> tuple[list[ContainerKey], list[ContainerKey] | None]:
+        # Depth-first, with an explicit stack so deep graphs don't hit the
+        # recursion limit
+        order: list[ContainerKey] = []
+        cycle = None
+        finished: set[ContainerKey] = set()
+
+        for root in roots:
+            if root in finished:
+                continue
+
+            path = [root]
+            on_path = {root}
+            stack = [iter(self.dependencies.get(root, ()))]
+            while stack:
+                for dep in stack[-1]:
+                    if dep in finished:
+                        continue
+                    if dep in on_path:
+                        if cycle is None:
+                            cycle = [*path[path.index(dep) :], dep]
+                        continue
+
+                    path.append(dep)
+                    on_path.add(dep)
+                    stack.append(iter(self.dependencies.get(dep, ())))
+                    break
+                else:
+                    key = path.pop()
+                    on_path.remove(key)
+                    stack.pop()
+                    finished.add(key)
+                    order.append(key)
+
+        return order, cycle
@@ -0,0 +1,134 @@
+from bisect import bisect_left
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from dipin.container import ContainerKey
+
+# Upper bounds of latency histogram buckets, in seconds
+DEFAULT_BUCKETS = (1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0)
+
+
+class ResolutionHook:
+    """Receives resolution events. Subclasses override the events they need.
+
+    Depth is the number of factories between the key and the resolution that
+    requested it, so a key requested directly has a depth of 0. Durations are
+    in seconds.
+    """
+
+    def on_resolve_start(self, key: ContainerKey, depth: int): ...
+
+    def on_resolve_end(self, key: ContainerKey, depth: int, duration: float): ...
+
+    def on_cache_hit(self, key: ContainerKey, depth: int): ...
+
+    def on_cache_miss(self, key: ContainerKey, depth: int): ...
+
+    def on_factory(self, key: ContainerKey, depth: int, duration: float): ...
+
+    def on_teardown(self, key: ContainerKey, depth: int, duration: float): ...
+
+
+class Instrumentation:
+    """Dispatches resolution events to the registered hooks"""
+
+    hooks: list[ResolutionHook]
+
+    def __init__(self, hooks: list[ResolutionHook] | None = None):
+        self.hooks = hooks or []
+
+    def resolve_start(self, key: ContainerKey, depth: int):
+        for hook in self.hooks:
+            hook.on_resolve_start(key, depth)
+
+    def resolve_end(self, key: ContainerKey, depth: int, duration: float):
+        for hook in self.hooks:
+            hook.on_resolve_end(key, depth, duration)
+
+    def cache_hit(self, key: ContainerKey, depth: int):
+        for hook in self.hooks:
+            hook.on_cache_hit(key, depth)
+
+    def cache_miss(self, key: ContainerKey, depth: int):
+        for hook in self.hooks:
+            hook.on_cache_miss(key, depth)
+
+    def factory(self, key: ContainerKey, depth: int, duration: float):
+        for hook in self.hooks:
+            hook.on_factory(key, depth, duration)
+
+    def teardown_callback(
+        self, key: ContainerKey, depth: int
+    ) -> Callable[[float], None]:
+        def teardown(duration: float):
+            for hook in self.hooks:
+                hook.on_teardown(key, depth, duration)
+
+        return teardown
+
+
+class Histogram:
+    bounds: tuple[float, ...]
+    # One count per bucket, plus one for values above the last bound
+    counts: list[int]
+    count: int
+    total: float
+
+    def __init__(self, bounds: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+@dataclass
+class KeyStats:
+    resolutions: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    resolve_time: Histogram = field(default_factory=Histogram)
+    factory_time: Histogram = field(default_factory=Histogram)
+    teardown_time: Histogram = field(default_factory=Histogram)
+
+
+class ResolutionStats(ResolutionHook):
+    """Counts resolutions and records latency histograms for each key"""
+
+    stats: dict[ContainerKey, KeyStats]
+
+    def __init__(self):
+        self.stats = {}
+
+    def __getitem__(self, key: ContainerKey) -> KeyStats:
+        if (stats := self.stats.get(key)) is None:
+            stats = self.stats[key] = KeyStats()
+        return stats
+
+    def on_resolve_end(self, key: ContainerKey, depth: int, duration: float):
+        stats = self[key]
+        stats.resolutions += 1
+        stats.resolve_time.record(duration)
+
+    def on_cache_hit(self, key: ContainerKey, depth: int):
+        self[key].cache_hits += 1
+
+    def on_cache_miss(self, key: ContainerKey, depth: int):
+        self[key].cache_misses += 1
+
+    def on_factory(self, key: ContainerKey, depth: int, duration: float):
+        self[key].factory_time.record(duration)
+
+    def on_teardown(self, key: ContainerKey, depth: int, duration: float):
+        self[key].teardown_time.record(duration)
+
+    def reset(self):
+        self.stats.clear()
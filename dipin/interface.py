@@ -1,17 +1,43 @@
+import inspect
+import logging
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from contextlib import (
+    AbstractAsyncContextManager,
+    AbstractContextManager,
+    asynccontextmanager,
+    contextmanager,
+)
 from functools import partial
-from typing import Annotated
+from typing import Annotated, Any, AsyncGenerator, get_args, get_origin
+
+import anyio
 
-from dipin.resolver import Resolver
+from dipin.cache import CachePolicy
+from dipin.graph import DependencyGraph
+from dipin.instrumentation import ResolutionHook
+from dipin.lazy import Lazy
+from dipin.override import OVERRIDES, Override
+from dipin.resolver import COLLECTIONS, CircularDependencyError, Resolver
+from dipin.scope import Scope
 from dipin.container import (
     Instance,
     ContainerKey,
     Container,
+    ContainerItem,
+    DefinedFactoryContainerItem,
+    Execution,
+    FactoryContainerItem,
+    InstanceContainerItem,
     InstanceType,
     Name,
     Factory,
     LookupKey,
+    NOT_CACHED,
 )
-from fastapi import Depends
+from fastapi import Depends, FastAPI
+
+logger = logging.getLogger(__name__)
 
 
 class ResolvingContainer:
@@ -23,7 +49,8 @@ class ResolvingContainer:
     def __init__(
         self, container: Container | None = None, resolver: Resolver | None = None
     ):
-        self.container = container or Container()
+        # Empty containers are falsy
+        self.container = container if container is not None else Container()
         self.resolver = resolver or Resolver(self.container)
 
     def register_instance(self, instance: Instance, name: str | None = None) -> None:
@@ -37,11 +64,20 @@ class ResolvingContainer:
         factory: Factory | None = None,
         name: Name | None = None,
         create_once: bool = False,
+        cache: CachePolicy | None = None,
+        keyed: bool = False,
+        execution: Execution = Execution.INLINE,
     ) -> None:
-        self.container.register_factory(type_, factory, name, create_once)
+        self.container.register_factory(
+            type_, factory, name, create_once, cache, keyed, execution
+        )
 
-    def get(self, key: LookupKey) -> Instance:
-        container_key = self.get_potential_key(key)
+    def get(self, lookup: LookupKey, /, key: Hashable | None = None) -> Instance:
+        """Resolve a type or name, passing keyed factories the key"""
+
+        container_key = self.get_potential_key(lookup)
+        if key is not None:
+            return self.resolver.get_keyed(container_key, key)
         return self.retrieve(container_key)
 
     def get_potential_key(self, key: LookupKey) -> ContainerKey:
@@ -58,15 +94,161 @@ class ResolvingContainer:
         return self.get(item)
 
     def retrieve(self, container_key: ContainerKey) -> Instance:
-        if self.container.is_cached(container_key):
-            return self.container.get_cached(container_key)
+        return self.resolver.get(container_key)
+
+    async def aget(
+        self,
+        lookup: LookupKey,
+        /,
+        scope: Scope | None = None,
+        key: Hashable | None = None,
+    ) -> Instance:
+        container_key = self.get_potential_key(lookup)
+        if key is not None:
+            return await self.resolver.aget_keyed(container_key, key, scope)
+        return await self.aretrieve(container_key, scope)
+
+    async def aretrieve(
+        self, container_key: ContainerKey, scope: Scope | None = None
+    ) -> Instance:
+        return await self.resolver.aget(container_key, scope)
+
+    def get_all(self, type_: InstanceType) -> list[Instance]:
+        return self.resolver.get_all(type_)
+
+    async def aget_all(
+        self, type_: InstanceType, scope: Scope | None = None
+    ) -> list[Instance]:
+        return await self.resolver.aget_all(type_, scope)
+
+    def warmup(self) -> dict[ContainerKey, float]:
+        """Construct all create_once factories, returning each one's build time"""
+
+        timings = {}
+        for level in self.singleton_levels():
+            for key in level:
+                started = time.perf_counter()
+                self.retrieve(key)
+                timings[key] = time.perf_counter() - started
+
+        return timings
+
+    async def awarmup(self) -> dict[ContainerKey, float]:
+        """Construct all create_once factories, building independent ones together"""
+
+        timings = {}
+
+        async def construct(key: ContainerKey):
+            started = time.perf_counter()
+            await self.aretrieve(key)
+            timings[key] = time.perf_counter() - started
+
+        for level in self.singleton_levels():
+            async with anyio.create_task_group() as tg:
+                for key in level:
+                    tg.start_soon(construct, key)
+
+        return timings
+
+    def singleton_levels(self) -> list[list[ContainerKey]]:
+        """Uncached create_once items, grouped so each only depends on earlier groups"""
+
+        singletons = [
+            key
+            for key in list(self.container.container)
+            if self.container.should_cache(key) and not self.container.is_cached(key)
+        ]
+
+        graph = self.resolver.build_graph(singletons)
+        if cycle := graph.find_cycle():
+            raise CircularDependencyError(cycle[0], cycle)
+
+        return self.dependency_levels(graph, singletons)
+
+    def dependency_levels(
+        self, graph: DependencyGraph, keys: list[ContainerKey]
+    ) -> list[list[ContainerKey]]:
+        depths = graph.depths()
+        levels: dict[int, list[ContainerKey]] = {}
+        for key in keys:
+            levels.setdefault(depths.get(key, 0), []).append(key)
+
+        return [levels[level] for level in sorted(levels)]
+
+    async def aclose(self):
+        """Tear down cached instances, closing dependents before their dependencies
 
-        instance = self.resolver.get(container_key)
+        Instances in cache policies are torn down first, then create_once
+        instances, tearing down independent ones together. Failed teardowns are
+        logged, so the rest still run.
+        """
 
-        if self.container.should_cache(container_key):
-            self.container.set_cached(container_key, instance)
+        # A child's items include its parent's, whose caches stay open, except
+        # for the instances the child cached in them
+        container = self.container
+        policies = {
+            id(item.cache): item.cache
+            for item in list(container.container.values())
+            if isinstance(item, FactoryContainerItem) and item.cache is not None
+        }
+        for policy in policies.values():
+            if container.parent is None:
+                policy.clear()
+            else:
+                policy.evict(lambda key: type(key) is tuple and key[0] is container)
+            for entry in policy.pop_evicted():
+                await self.finalize(entry.afinalize)
 
-        return instance
+        finalized = list(self.container.finalizers)
+        graph = self.resolver.build_graph(finalized)
+        for level in reversed(self.dependency_levels(graph, finalized)):
+            async with anyio.create_task_group() as tg:
+                for key in level:
+                    if (finalizer := self.container.pop_cached(key)) is not None:
+                        tg.start_soon(self.finalize, finalizer.afinalize)
+
+    async def finalize(self, teardown: Callable[[], Awaitable[None]]):
+        try:
+            await teardown()
+        except Exception:
+            logger.exception("Failed to tear down a cached instance")
+
+    def override(
+        self,
+        key: LookupKey,
+        instance: Instance | None = None,
+        factory: Factory | None = None,
+    ) -> Override:
+        """Substitute an instance or factory for a key, in the current context only"""
+
+        if (instance is None) == (factory is None):
+            raise ValueError("Override with either an instance or a factory")
+
+        container_key = self.get_potential_key(key)
+        if factory is None:
+            item = InstanceContainerItem(instance=instance)
+        else:
+            item = DefinedFactoryContainerItem(use_cache=False, factory=factory)
+
+        return Override(self.resolver, {container_key: item})
+
+    def child(self) -> "ResolvingContainer":
+        """A container overlaying registrations on this one, without copying it"""
+
+        container = self.container.child()
+        return ResolvingContainer(container, self.resolver.child(container))
+
+    def add_hook(self, hook: ResolutionHook):
+        self.resolver.add_hook(hook)
+
+    def remove_hook(self, hook: ResolutionHook):
+        self.resolver.remove_hook(hook)
+
+    def validate(self) -> DependencyGraph:
+        return self.resolver.validate()
+
+    def freeze(self):
+        self.container.freeze()
 
     def __len__(self) -> int:
         return len(self.container)
@@ -82,10 +264,257 @@ class ResolvingContainer:
 class FastAPIContainer(ResolvingContainer):
     """High-level interface for the DI container, for FastAPI application"""
 
+    dependencies: dict[LookupKey, Any]
+    native: bool
+    native_dependencies: dict[ContainerKey, tuple[ContainerItem, Callable]]
+
+    def __init__(
+        self,
+        container: Container | None = None,
+        resolver: Resolver | None = None,
+        native: bool = False,
+    ):
+        super().__init__(container, resolver)
+        # Built once per key, as routes subscribe to the same dependencies
+        self.dependencies = {}
+        # Expand dependency graphs into FastAPI dependencies, for FastAPI to solve
+        self.native = native
+        self.native_dependencies = {}
+
+    async def request_scope(self) -> AsyncGenerator[Scope, None]:
+        """Shared by all dependencies of a request, and closed once it finishes"""
+
+        async with Scope() as scope:
+            yield scope
+
     def __getitem__(self, key: LookupKey) -> Depends:
+        if (dependency := self.dependencies.get(key)) is None:
+            dependency = self.dependencies[key] = self.build_dependency(key)
+        return dependency
+
+    def build_dependency(self, key: LookupKey) -> Depends:
+        if get_origin(key) is Lazy:
+            container_key = self.get_potential_key(get_args(key)[0])
+            return Annotated[key, Depends(self.lazy_dependency(container_key))]
+
+        if get_origin(key) in COLLECTIONS:
+            dependency = self.collection_dependency(get_args(key)[0])
+            return Annotated[key, Depends(dependency)]
+
         container_key = self.get_potential_key(key)
 
-        return Annotated[
-            container_key[0],
-            Depends(partial(self.retrieve, container_key), use_cache=False),
-        ]
+        # Frozen singletons can't change, so don't need resolving or a scope
+        if container_key in self.container.singletons:
+            instance = self.container.singletons[container_key]
+            resolver = self.resolver
+
+            async def singleton() -> Instance:
+                if OVERRIDES.get() is not None:
+                    return await resolver.aget(container_key)
+                return instance
+
+            return Annotated[container_key[0], Depends(singleton, use_cache=False)]
+
+        if self.native:
+            graph = self.resolver.build_graph([container_key])
+            for error in graph.errors.values():
+                raise error
+            if cycle := graph.find_cycle():
+                raise CircularDependencyError(cycle[0], cycle)
+
+            dependency = self.native_dependency(container_key)
+            return Annotated[container_key[0], Depends(dependency)]
+
+        resolver = self.resolver
+        container = self.container
+
+        # FastAPI runs sync dependencies in a threadpool, so resolve natively
+        async def retrieve(
+            scope: Annotated[Scope, Depends(self.request_scope)],
+        ) -> Instance:
+            # Routes are declared before the container is frozen, so frozen
+            # singletons are looked up as the dependency is called
+            instance = container.singletons.get(container_key, NOT_CACHED)
+            if instance is not NOT_CACHED and OVERRIDES.get() is None:
+                return instance
+            return await resolver.aget(container_key, scope)
+
+        return Annotated[container_key[0], Depends(retrieve, use_cache=False)]
+
+    def lazy_dependency(self, key: ContainerKey) -> Callable:
+        resolver = self.resolver
+
+        async def lazy(scope: Annotated[Scope, Depends(self.request_scope)]) -> Lazy:
+            return Lazy(resolver, key, scope)
+
+        return lazy
+
+    def collection_dependency(
+        self, type_: InstanceType, default: Any = inspect.Parameter.empty
+    ) -> Callable:
+        resolver = self.resolver
+
+        async def collection(
+            scope: Annotated[Scope, Depends(self.request_scope)],
+        ) -> list[Instance]:
+            return await resolver.aget_collection(type_, scope, default)
+
+        return collection
+
+    def native_dependency(self, key: ContainerKey) -> Callable:
+        """A FastAPI dependency constructing the key, depending on its dependencies
+
+        Each key has one dependency, so FastAPI builds it once per request.
+        """
+
+        item = self.container.get(key)
+        native = self.native_dependencies.get(key)
+        if native is not None and native[0] is item:
+            return native[1]
+
+        if isinstance(item, InstanceContainerItem):
+            instance = item.instance
+            resolver = self.resolver
+
+            async def dependency() -> Instance:
+                if is_overridden(resolver, key):
+                    return await resolver.aget(key)
+                return instance
+
+        elif item.use_cache or item.cache is not None:
+            # Cached across requests, so resolved outside FastAPI's request cache
+            resolver = self.resolver
+
+            async def dependency() -> Instance:
+                return await resolver.aget(key)
+
+        else:
+            dependency = self.native_factory(key, item)
+
+        self.native_dependencies[key] = (item, dependency)
+        return dependency
+
+    def native_factory(self, key: ContainerKey, item: ContainerItem) -> Callable:
+        plan = self.resolver.get_plan(key, item)
+
+        defaults = {}
+        parameters = []
+        for param in plan.parameters:
+            if param.dependency is None:
+                defaults[param.name] = param.default
+                continue
+
+            if param.lazy:
+                lazy = self.lazy_dependency(param.dependency)
+                annotation = Annotated[Lazy[param.dependency[0]], Depends(lazy)]
+            elif param.collection:
+                collection = self.collection_dependency(
+                    param.dependency[0], param.default
+                )
+                annotation = Annotated[list[param.dependency[0]], Depends(collection)]
+            else:
+                dependency_key = self.resolver.resolve_key(param.dependency)
+                dependency = self.native_dependency(dependency_key)
+                annotation = Annotated[dependency_key[0], Depends(dependency)]
+
+            parameters.append(
+                inspect.Parameter(
+                    param.name, inspect.Parameter.KEYWORD_ONLY, annotation=annotation
+                )
+            )
+
+        factory = partial(plan.factory, **defaults) if defaults else plan.factory
+        resolver = self.resolver
+
+        # Sync factories are called as resolution calls them, not in FastAPI's
+        # threadpool
+        if inspect.isasyncgenfunction(plan.factory):
+            construct = asynccontextmanager(factory)
+
+        elif inspect.isgeneratorfunction(plan.factory):
+
+            def construct(**kwargs) -> AbstractAsyncContextManager:
+                return entered(contextmanager(factory)(**kwargs))
+
+        elif plan.is_coroutine:
+
+            @asynccontextmanager
+            async def construct(**kwargs) -> AsyncGenerator[Instance, None]:
+                async with entered(await factory(**kwargs)) as instance:
+                    yield instance
+
+        elif plan.execution is not Execution.INLINE:
+            execution = plan.execution
+
+            @asynccontextmanager
+            async def construct(**kwargs) -> AsyncGenerator[Instance, None]:
+                call = partial(factory, **kwargs)
+                result = await resolver.arun_blocking(execution, call)
+                async with entered(result) as instance:
+                    yield instance
+
+        else:
+
+            def construct(**kwargs) -> AbstractAsyncContextManager:
+                return entered(factory(**kwargs))
+
+        async def dependency(**kwargs) -> AsyncGenerator[Instance, None]:
+            # FastAPI doesn't know about overrides, so the overriding item is
+            # resolved instead of calling the factory
+            if is_overridden(resolver, key):
+                async with Scope() as scope:
+                    yield await resolver.aget(key, scope)
+            else:
+                async with construct(**kwargs) as instance:
+                    yield instance
+
+        dependency.__signature__ = inspect.Signature(parameters)
+        return dependency
+
+    def child(self) -> "FastAPIContainer":
+        container = self.container.child()
+        return FastAPIContainer(container, self.resolver.child(container), self.native)
+
+    @asynccontextmanager
+    async def lifespan(self, app: FastAPI) -> AsyncGenerator[None, None]:
+        """Warm up and freeze the container, tearing it down after serving requests"""
+
+        timings = await self.awarmup()
+        for key, duration in timings.items():
+            logger.info("Constructed %s in %.3fs", key, duration)
+
+        self.freeze()
+
+        try:
+            # Refresh-ahead caches rebuild in the background while serving requests
+            async with anyio.create_task_group() as tg:
+                self.resolver.task_group = tg
+                try:
+                    yield
+                finally:
+                    self.resolver.task_group = None
+                    tg.cancel_scope.cancel()
+        finally:
+            await self.aclose()
+
+
+def is_overridden(resolver: Resolver, key: ContainerKey) -> bool:
+    """Whether the key is overridden for the resolver in the current context"""
+
+    return (overrides := OVERRIDES.get()) is not None and (
+        resolver in overrides and key in overrides[resolver].items
+    )
+
+
+@asynccontextmanager
+async def entered(instance: Instance) -> AsyncGenerator[Instance, None]:
+    """Enter factory results that are context managers, as resolution does"""
+
+    if isinstance(instance, AbstractAsyncContextManager):
+        async with instance as context:
+            yield context
+    elif isinstance(instance, AbstractContextManager):
+        with instance as context:
+            yield context
+    else:
+        yield instance
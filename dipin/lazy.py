@@ -0,0 +1,49 @@
+from typing import TYPE_CHECKING, Generic, TypeVar
+
+from dipin.container import ContainerKey
+from dipin.scope import Scope
+
+if TYPE_CHECKING:
+    from dipin.resolver import Resolver
+
+T = TypeVar("T")
+
+UNRESOLVED = object()
+
+
+class Lazy(Generic[T]):
+    """Injected in place of a dependency, resolving it the first time it's used
+
+    e.g. `def __init__(self, s3: Lazy[S3Client])`, then `s3.get()` or
+    `await s3.aget()`.
+    """
+
+    __slots__ = ("resolver", "key", "scope", "instance")
+
+    resolver: "Resolver"
+    key: ContainerKey
+    # The scope of the resolution the handle was injected into, if any
+    scope: Scope | None
+    instance: T
+
+    def __init__(
+        self, resolver: "Resolver", key: ContainerKey, scope: Scope | None = None
+    ):
+        self.resolver = resolver
+        self.key = key
+        self.scope = scope
+        self.instance = UNRESOLVED
+
+    def get(self) -> T:
+        if self.instance is UNRESOLVED:
+            self.instance = self.resolver.get(self.key)
+        return self.instance
+
+    async def aget(self) -> T:
+        if self.instance is UNRESOLVED:
+            self.instance = await self.resolver.aget(self.key, self.scope)
+        return self.instance
+
+    @property
+    def resolved(self) -> bool:
+        return self.instance is not UNRESOLVED
@@ -0,0 +1,71 @@
+import inspect
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from functools import wraps
+from typing import TYPE_CHECKING, Callable
+
+from dipin.container import ContainerItem, ContainerKey
+
+if TYPE_CHECKING:
+    from dipin.resolver import Resolver
+
+
+@dataclass(slots=True)
+class Overrides:
+    """A resolver's overridden items, and the resolver that resolves with them"""
+
+    items: dict[ContainerKey, ContainerItem]
+    resolver: "Resolver"
+
+
+# Overrides in the current context, for each resolver they apply to
+OVERRIDES: ContextVar[dict["Resolver", Overrides] | None] = ContextVar(
+    "dipin_overrides", default=None
+)
+
+
+class Override:
+    """Substitutes container items in the current context, e.g. for a test
+
+    Usable as a context manager, or a decorator of sync or async functions.
+    """
+
+    resolver: "Resolver"
+    items: dict[ContainerKey, ContainerItem]
+    tokens: list[Token]
+
+    def __init__(self, resolver: "Resolver", items: dict[ContainerKey, ContainerItem]):
+        self.resolver = resolver
+        self.items = items
+        self.tokens = []
+
+    def __enter__(self) -> "Override":
+        current = OVERRIDES.get() or {}
+
+        items = self.items
+        if (existing := current.get(self.resolver)) is not None:
+            items = existing.items | items
+
+        overrides = Overrides(items, self.resolver.override_view(items))
+        self.tokens.append(OVERRIDES.set(current | {self.resolver: overrides}))
+        return self
+
+    def __exit__(self, *exc_info):
+        OVERRIDES.reset(self.tokens.pop())
+
+    def __call__(self, func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                with Override(self.resolver, self.items):
+                    return await func(*args, **kwargs)
+
+        else:
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with Override(self.resolver, self.items):
+                    return func(*args, **kwargs)
+
+        return wrapper
@@ -1,115 +1,1638 @@
+import copy
 import inspect
+import logging
+import threading
+import time
+from collections.abc import (
+    Callable,
+    Collection,
+    Hashable,
+    Iterable,
+    Sequence,
+)
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AbstractAsyncContextManager, AbstractContextManager
+from dataclasses import dataclass, replace
 from functools import partial
-from typing import Generator, AsyncGenerator, get_args, Type
+from types import SimpleNamespace
+from typing import (
+    Annotated,
+    Any,
+    AsyncGenerator,
+    Generator,
+    Type,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
 
+import anyio
+import anyio.to_process
 import asyncer
+from anyio import CapacityLimiter
+from anyio.abc import TaskGroup
+
+from dipin.autowire import AutowirePolicy
+from dipin.cache import CacheEntry, CachePolicy
 from dipin.container import (
     InstanceType,
     ContainerKey,
     Factory,
     Container,
+    ContainerItem,
     Instance,
-    InstanceContainerItem,
-    DefinedFactoryContainerItem,
+    Execution,
+    ItemKind,
+    NOT_CACHED,
     PartialFactoryContainerItem,
+    describe_key,
 )
+from dipin.graph import DependencyGraph
+from dipin.instrumentation import Instrumentation, ResolutionHook
+from dipin.lazy import Lazy
+from dipin.override import OVERRIDES
+from dipin.scope import ABANDONED, PendingResolution, Resolutions, Scope
 from dipin.util import is_class_type
 
 DependencyTree = dict[ContainerKey, dict[str, ContainerKey]]
 
 
+@dataclass(slots=True)
+class PlanParameter:
+    name: str
+    dependency: ContainerKey | None
+    default: Any = None
+    # Inject a Lazy handle, resolving the dependency once it's used
+    lazy: bool = False
+    # Inject every item registered as the dependency's type, or the default
+    # (if it has one) when none are
+    collection: bool = False
+
+
+@dataclass(slots=True)
+class ResolutionPlan:
+    """A factory's parameters, compiled once from its signature"""
+
+    factory: Factory
+    parameters: list[PlanParameter]
+    is_coroutine: bool
+    # No parameters need resolving, so the factory can be called straight away
+    is_leaf: bool
+    execution: Execution = Execution.INLINE
+    # A sync leaf called on the event loop, so resolves without waiting
+    is_inline_leaf: bool = False
+
+
+@dataclass(slots=True)
+class Dependents:
+    """The items depending on each key, for the container revision they were found for"""
+
+    revision: int
+    keys: dict[ContainerKey, list[ContainerKey]]
+    # Types injected as collections, which items registered later can join
+    collections: set[InstanceType]
+
+
+@dataclass(slots=True)
+class Frame:
+    """A factory waiting on its dependencies, during iterative resolution"""
+
+    key: ContainerKey
+    plan: ResolutionPlan
+    kwargs: dict[str, Instance]
+    # Index of the next parameter to fill
+    index: int = 0
+    lock: "threading.RLock | None" = None
+    pending: PendingResolution | None = None
+    # When resolution of the key started, if instrumented
+    started: float = 0.0
+    # Where the instance and its dependencies are built, in async resolution
+    scope: Scope | None = None
+    resolutions: Resolutions | None = None
+    shared: PendingResolution | None = None
+
+
+logger = logging.getLogger(__name__)
+
+
+class Building(threading.local):
+    """Items with cache policies the current thread is constructing
+
+    Per thread, as background refreshes build without holding the item's lock.
+    """
+
+    keys: set[Hashable]
+
+    def __init__(self):
+        self.keys = set()
+
+
+# Returned in place of an instance when a factory's frame was pushed
+PUSHED = object()
+
+# Worker threads or processes running factories that don't run inline
+OFFLOAD_WORKERS = 8
+
+
+def leaf_factory(plan: ResolutionPlan) -> Factory:
+    if not plan.parameters:
+        return plan.factory
+    return partial(plan.factory, **{p.name: p.default for p in plan.parameters})
+
+
+def cached_key(
+    key: ContainerKey, item: ContainerItem, instance_key: Hashable | None
+) -> Hashable:
+    """The key of an item's instance in its cache policy"""
+
+    if not item.keyed:
+        return key
+    if instance_key is None:
+        raise MissingKeyError(key)
+    return key, instance_key
+
+
+def keyed_factory(plan: ResolutionPlan, instance_key: Hashable | None) -> Factory:
+    if instance_key is None:
+        return plan.factory
+    return partial(plan.factory, key=instance_key)
+
+
+# Annotations injecting every item registered as their type
+COLLECTIONS = (list, Sequence)
+
+
+def is_collectable(type_: Any) -> bool:
+    """Whether items can be registered as the type, to inject as a collection"""
+
+    return isinstance(type_, type) and is_class_type(type_)
+
+
+def unwrap_annotated(annotation: Any) -> Any:
+    if get_origin(annotation) is Annotated:
+        return get_args(annotation)[0]
+    return annotation
+
+
+def evaluate_type_hints(factory: Factory) -> dict[str, Any]:
+    """Evaluate string annotations, e.g. with `from __future__ import annotations`
+
+    Annotations that can't be evaluated, e.g. of classes defined in a function,
+    are left as strings.
+    """
+
+    if isinstance(factory, partial):
+        return evaluate_type_hints(factory.func)
+
+    target = factory
+    # Classes can refer to themselves, e.g. `def __init__(self, parent: "Node")`
+    localns = None
+    if inspect.isclass(factory):
+        target = factory.__init__
+        localns = {factory.__name__: factory}
+
+    try:
+        return get_type_hints(target, localns=localns, include_extras=True)
+    except NameError:
+        pass
+    except TypeError:
+        # Callables that don't support annotations, e.g. slot wrappers
+        return {}
+
+    # Evaluate the annotations that can be, one at a time
+    hints = {}
+    for name, annotation in getattr(target, "__annotations__", {}).items():
+        try:
+            hints[name] = get_type_hints(
+                SimpleNamespace(__annotations__={name: annotation}),
+                globalns=getattr(inspect.unwrap(target), "__globals__", None),
+                localns=localns,
+                include_extras=True,
+            )[name]
+        except NameError:
+            hints[name] = annotation
+    return hints
+
+
+def cycle_path(keys: Iterable[ContainerKey], key: ContainerKey) -> list[ContainerKey]:
+    keys = list(keys)
+    return [*keys[keys.index(key) :], key]
+
+
 class Resolver:
     container: Container
+    concurrent: bool
+    autowire_policy: AutowirePolicy
+    locks: dict[ContainerKey, threading.RLock]
+    pending: dict[ContainerKey, PendingResolution]
+    validated_revision: int | None
+    instrumentation: Instrumentation | None
+    building: Building
+    task_group: TaskGroup | None
+    refresher: ThreadPoolExecutor
+    hints: dict[Factory, dict[str, Any]]
+    dependents_graph: Dependents | None
+    localized_revision: int | None
+    limiter: CapacityLimiter
+    parent: "Resolver | None"
 
-    def __init__(self, container: Container):
+    def __init__(
+        self,
+        container: Container,
+        concurrent: bool = False,
+        autowire_policy: AutowirePolicy | None = None,
+        limiter: CapacityLimiter | None = None,
+    ):
         self.container = container
+        # Resolve sibling dependencies concurrently in aget(), building each key
+        # once per resolution
+        self.concurrent = concurrent
+        self.autowire_policy = autowire_policy or AutowirePolicy()
+        # Cached items being constructed, so concurrent callers wait for one build
+        self.locks = {}
+        self.pending = {}
+        self.validated_revision = None
+        # Only set while hooks are registered, so uninstrumented resolution only
+        # pays for a None check
+        self.instrumentation = None
+        # Items with cache policies being constructed, to detect cycles
+        self.building = Building()
+        # Runs refresh-ahead rebuilds in async resolution. Without one, entries
+        # are rebuilt once they expire instead.
+        self.task_group = None
+        # Runs refresh-ahead rebuilds in sync resolution
+        self.refresher = ThreadPoolExecutor(OFFLOAD_WORKERS, "dipin-refresh")
+        # Evaluated annotations of each factory compiled, as that's expensive
+        self.hints = {}
+        # Reverse dependencies, for the container revision they were found for
+        self.dependents_graph = None
+        # Revision the container's localized items were found for, if a child
+        self.localized_revision = None
+        # Bounds the factories running in worker threads or processes at once,
+        # so they don't take over anyio's default thread pool
+        self.limiter = limiter or CapacityLimiter(OFFLOAD_WORKERS)
+        # The resolver of the parent container, if a child's
+        self.parent = None
+
+    def child(self, container: Container) -> "Resolver":
+        """A resolver for a child container, sharing the type hints evaluated so far
+
+        Builds of the parent's cached items are shared too, so children wait for
+        one build, as they're cached in the parent. Copied rather than
+        constructed, as children may be created per request.
+        """
+
+        resolver = copy.copy(self)
+        resolver.container = container
+        resolver.parent = self
+        resolver.validated_revision = None
+        resolver.dependents_graph = None
+        resolver.localized_revision = None
+        return resolver
+
+    def override_view(self, items: dict[ContainerKey, ContainerItem]) -> "Resolver":
+        """A resolver with the items overridden, sharing everything they don't affect
+
+        Cached items depending on an overridden item are built for each
+        resolution instead, so their cached instances aren't used or replaced.
+        """
+
+        container = Container(self.container)
+        # Unaffected items are cached and built as usual
+        container.cache = self.container.cache
+        container.finalizers = self.container.finalizers
+        container.container.update(items)
+
+        dependents = self.dependents().keys
+        pending = list(items)
+        affected = set()
+        while pending:
+            for dependent in dependents.get(pending.pop(), ()):
+                if dependent in affected or dependent in items:
+                    continue
+                affected.add(dependent)
+                pending.append(dependent)
+
+                # Unregistered dependents are autowired uncached, so only lead
+                # to cached items
+                item = self.container.container.get(dependent)
+                if item is None:
+                    continue
+                if item.use_cache or item.cache is not None:
+                    container.container[dependent] = replace(
+                        item, use_cache=False, cache=None
+                    )
+
+        if self.container.parent is not None:
+            self.localize()
+
+        resolver = self.child(container)
+        # Dependents of the overridden items are already built uncached
+        resolver.localized_revision = container.revision
+        return resolver
+
+    def localize(self):
+        """Find the parent's items that depend on the child container's registrations
+
+        The child caches its own instances of them, built with its registrations,
+        rather than share the parent's.
+        """
+
+        if (revision := self.container.revision) == self.localized_revision:
+            return
+
+        # Ancestors' registrations are included, so items depending on them
+        # aren't cached above them, even if they haven't localized their own
+        registered = []
+        container = self.container
+        while container.parent is not None:
+            registered.extend(
+                key
+                for key, item in container.own_items().items()
+                if item.kind is ItemKind.INSTANCE or not item.autowired
+            )
+            container = container.parent
+
+        # Items above the child are the same in every child, so their
+        # dependents are found once by the root resolver, and shared
+        root = self
+        while root.parent is not None:
+            root = root.parent
+        graph = root.dependents()
+
+        # Registrations joining a collection change the items injected it
+        for key in list(registered):
+            for type_ in graph.collections:
+                try:
+                    if isinstance(key[0], type) and issubclass(key[0], type_):
+                        registered.append((type_, None))
+                except TypeError:
+                    # Protocols with data members don't support issubclass
+                    continue
+
+        dependents = graph.keys
+        localized = set()
+        while registered:
+            for dependent in dependents.get(registered.pop(), ()):
+                if dependent not in localized:
+                    localized.add(dependent)
+                    registered.append(dependent)
+
+        self.container.localized = localized
+        self.localized_revision = revision
+
+    def dependents(self) -> Dependents:
+        """The items depending on each key, without autowiring any
+
+        Includes lazy dependencies, as cached items keep the instances their
+        handles resolve.
+        """
+
+        revision = self.container.revision
+        if (graph := self.dependents_graph) is not None and graph.revision == revision:
+            return graph
+
+        dependents: dict[ContainerKey, list[ContainerKey]] = {}
+        collections = set()
+        seen = set()
+        pending = list(self.container.container)
+        while pending:
+            key = pending.pop()
+            if key in seen:
+                continue
+            seen.add(key)
+
+            try:
+                if key in self.container:
+                    if (item := self.container.get(key)).kind is ItemKind.INSTANCE:
+                        continue
+                    parameters = self.get_plan(key, item).parameters
+                elif self.can_autowire(key[0]):
+                    parameters = self.compile_parameters(key[0])
+                else:
+                    continue
+            except UnfillableArgumentError:
+                continue
+
+            for param in parameters:
+                if param.dependency is None:
+                    continue
+
+                if param.collection:
+                    # Depends on the type itself too, for items registered
+                    # later to be found joining the collection
+                    collections.add(param.dependency[0])
+                    dependents.setdefault(param.dependency, []).append(key)
+                    dependencies = self.container.lookup_all(param.dependency[0])
+                else:
+                    dependencies = [param.dependency]
+                for dependency in dependencies:
+                    dependents.setdefault(dependency, []).append(key)
+                    pending.append(dependency)
+
+        graph = self.dependents_graph = Dependents(revision, dependents, collections)
+        return graph
+
+    def add_hook(self, hook: ResolutionHook):
+        if self.instrumentation is None:
+            self.instrumentation = Instrumentation()
+        self.instrumentation.hooks.append(hook)
+
+    def remove_hook(self, hook: ResolutionHook):
+        if self.instrumentation is None:
+            return
+
+        self.instrumentation.hooks.remove(hook)
+        if not self.instrumentation.hooks:
+            self.instrumentation = None
 
     def get(self, key: ContainerKey) -> Instance:
-        # If the key is not in the container, attempt to autowire it
-        if key not in self.container:
+        """Resolve a key, walking its dependencies with an explicit stack"""
+
+        if (overrides := OVERRIDES.get()) is not None and self in overrides:
+            return overrides[self].resolver.get(key)
+
+        if self.container.parent is not None:
+            self.localize()
+
+        if key in self.container.singletons and self.instrumentation is None:
+            return self.container.singletons[key]
+
+        frames: list[Frame] = []
+        active: set[ContainerKey] = set()
+        try:
+            result = self.start(key, frames, active)
+            while frames:
+                frame = frames[-1]
+                parameters = frame.plan.parameters
+
+                if result is not PUSHED:
+                    frame.kwargs[parameters[frame.index].name] = result
+                    frame.index += 1
+
+                # Fill parameters until one needs a factory constructing
+                while frame.index < len(parameters):
+                    param = parameters[frame.index]
+                    if param.dependency is None:
+                        frame.kwargs[param.name] = param.default
+                    elif param.lazy:
+                        frame.kwargs[param.name] = Lazy(self, param.dependency)
+                    elif param.collection:
+                        frame.kwargs[param.name] = self.get_collection(
+                            param.dependency[0], param.default
+                        )
+                    elif (
+                        result := self.start(param.dependency, frames, active)
+                    ) is PUSHED:
+                        break
+                    else:
+                        frame.kwargs[param.name] = result
+                    frame.index += 1
+                else:
+                    factory = partial(frame.plan.factory, **frame.kwargs)
+                    finalizer = CacheEntry() if frame.lock is not None else None
+                    result = self.construct(
+                        frame.key, frame.plan, factory, len(frames) - 1, finalizer
+                    )
+
+                    frames.pop()
+                    active.remove(frame.key)
+                    if frame.lock is not None:
+                        self.container.set_cached(frame.key, result, finalizer)
+                        self.release_build(frame.key, frame.lock)
+
+                    if (hooks := self.instrumentation) is not None:
+                        duration = time.perf_counter() - frame.started
+                        hooks.resolve_end(frame.key, len(frames), duration)
+
+            return result
+        except BaseException:
+            for frame in frames:
+                if frame.lock is not None:
+                    self.release_build(frame.key, frame.lock)
+            raise
+
+    def start(
+        self, key: ContainerKey, frames: list[Frame], active: set[ContainerKey]
+    ) -> Instance:
+        """Return an existing instance for the key, or push a frame to construct it"""
+
+        if (hooks := self.instrumentation) is None:
+            return self._start(key, frames, active)
+
+        depth = len(frames)
+        started = time.perf_counter()
+        hooks.resolve_start(key, depth)
+
+        result = self._start(key, frames, active)
+        if result is PUSHED:
+            # Resolution ends once the frame's factory is constructed
+            frames[-1].started = started
+        else:
+            hooks.resolve_end(key, depth, time.perf_counter() - started)
+
+        return result
+
+    def _start(
+        self, key: ContainerKey, frames: list[Frame], active: set[ContainerKey]
+    ) -> Instance:
+        if key in self.container.singletons:
+            if (hooks := self.instrumentation) is not None:
+                hooks.cache_hit(key, len(frames))
+            return self.container.singletons[key]
+
+        if (item := self.container.container.get(key)) is None:
+            key = self.resolve_key(key)
+            item = self.container.get(key)
+
+        if item.kind is ItemKind.INSTANCE:
+            return item.instance
+
+        if item.cache is not None:
+            return self.get_with_policy(key, item, len(frames))
+
+        # Compiled before claiming the build, so an unfillable parameter doesn't
+        # leave it claimed
+        plan = self.get_plan(key, item)
+
+        lock = None
+        if item.use_cache:
+            cache = self.container.cache
+            if (instance := cache.get(key, NOT_CACHED)) is not NOT_CACHED:
+                if (hooks := self.instrumentation) is not None:
+                    hooks.cache_hit(key, len(frames))
+                return instance
+
+            # Held until the factory is constructed, so concurrent callers wait
+            # for one build. Re-entrant, so cycles are detected below.
+            claim = self.claim_key(key)
+            lock = self.locks.get(claim) or self.locks.setdefault(
+                claim, threading.RLock()
+            )
+            lock.acquire()
+            if (instance := cache.get(key, NOT_CACHED)) is not NOT_CACHED:
+                lock.release()
+                if (hooks := self.instrumentation) is not None:
+                    hooks.cache_hit(key, len(frames))
+                return instance
+
+            if (hooks := self.instrumentation) is not None:
+                hooks.cache_miss(key, len(frames))
+
+        if key in active:
+            if lock is not None:
+                lock.release()
+            keys = (frame.key for frame in frames)
+            raise CircularDependencyError(key, cycle_path(keys, key))
+
+        if plan.is_leaf:
             try:
-                if not (key_ := self.autowire(key[0])):
-                    raise KeyError(f"Unable to resolve {key}")
-            except UnfillableArgumentError as e:
-                e.dependency = key
-                raise e
-            key = key_
+                finalizer = CacheEntry() if lock is not None else None
+                instance = self.construct(
+                    key, plan, leaf_factory(plan), len(frames), finalizer
+                )
+                if lock is not None:
+                    self.container.set_cached(key, instance, finalizer)
+            finally:
+                if lock is not None:
+                    self.release_build(key, lock)
+            return instance
 
-        item = self.container.get(key)
+        frames.append(Frame(key, plan, {}, 0, lock))
+        active.add(key)
+        return PUSHED
+
+    def release_build(self, key: ContainerKey, lock: threading.RLock):
+        """Release the lock held while building a cached item"""
+
+        # Later callers find the instance, so locks only live for a build
+        claim = self.claim_key(key)
+        if self.locks.get(claim) is lock:
+            del self.locks[claim]
+        lock.release()
+
+    async def aget(self, key: ContainerKey, scope: Scope | None = None) -> Instance:
+        """Resolve a key, walking its dependencies with an explicit stack"""
+
+        if (overrides := OVERRIDES.get()) is not None and self in overrides:
+            return await overrides[self].resolver.aget(key, scope)
 
-        if isinstance(item, InstanceContainerItem):
+        if self.container.parent is not None:
+            self.localize()
+
+        if key in self.container.singletons and self.instrumentation is None:
+            return self.container.singletons[key]
+
+        return await self.aresolve(
+            key, scope, self.shared_resolutions(scope), self.active_keys()
+        )
+
+    async def aresolve(
+        self,
+        key: ContainerKey,
+        scope: Scope | None,
+        resolutions: Resolutions | None,
+        active: dict[ContainerKey, None] | None,
+        depth: int = 0,
+    ) -> Instance:
+        frames: list[Frame] = []
+        try:
+            result = await self.astart(key, frames, active, scope, resolutions, depth)
+            while frames:
+                frame = frames[-1]
+                parameters = frame.plan.parameters
+
+                if result is not PUSHED:
+                    frame.kwargs[parameters[frame.index].name] = result
+                    frame.index += 1
+
+                # Fill parameters until one needs a factory constructing
+                while frame.index < len(parameters):
+                    param = parameters[frame.index]
+                    if param.name in frame.kwargs:
+                        # Already resolved concurrently
+                        pass
+                    elif param.dependency is None:
+                        frame.kwargs[param.name] = param.default
+                    elif param.lazy:
+                        lazy = Lazy(self, param.dependency, frame.scope)
+                        frame.kwargs[param.name] = lazy
+                    elif param.collection:
+                        instances = await self.aget_collection(
+                            param.dependency[0], frame.scope, param.default
+                        )
+                        frame.kwargs[param.name] = instances
+                    elif (
+                        result := await self.astart(
+                            param.dependency,
+                            frames,
+                            active,
+                            frame.scope,
+                            frame.resolutions,
+                            depth + len(frames),
+                        )
+                    ) is PUSHED:
+                        break
+                    else:
+                        frame.kwargs[param.name] = result
+                    frame.index += 1
+                else:
+                    factory = partial(frame.plan.factory, **frame.kwargs)
+                    target = CacheEntry() if frame.pending is not None else frame.scope
+                    result = await self.aconstruct(
+                        frame.key,
+                        frame.plan,
+                        factory,
+                        depth + len(frames) - 1,
+                        target,
+                    )
+
+                    frames.pop()
+                    if active is not None:
+                        del active[frame.key]
+                    self.finish_frame(frame, result, target)
+
+                    if (hooks := self.instrumentation) is not None:
+                        duration = time.perf_counter() - frame.started
+                        hooks.resolve_end(frame.key, depth + len(frames), duration)
+
+            return result
+        except BaseException as e:
+            for frame in frames:
+                self.fail_frame(frame, e)
+            raise
+
+    async def astart(
+        self,
+        key: ContainerKey,
+        frames: list[Frame],
+        active: dict[ContainerKey, None] | None,
+        scope: Scope | None,
+        resolutions: Resolutions | None,
+        depth: int,
+    ) -> Instance:
+        """Return an existing instance for the key, or push a frame to construct it"""
+
+        if (hooks := self.instrumentation) is None:
+            return await self._astart(key, frames, active, scope, resolutions, depth)
+
+        started = time.perf_counter()
+        hooks.resolve_start(key, depth)
+
+        result = await self._astart(key, frames, active, scope, resolutions, depth)
+        if result is PUSHED:
+            frames[-1].started = started
+        else:
+            hooks.resolve_end(key, depth, time.perf_counter() - started)
+
+        return result
+
+    async def _astart(
+        self,
+        key: ContainerKey,
+        frames: list[Frame],
+        active: dict[ContainerKey, None] | None,
+        scope: Scope | None,
+        resolutions: Resolutions | None,
+        depth: int,
+    ) -> Instance:
+        if key in self.container.singletons:
+            if (hooks := self.instrumentation) is not None:
+                hooks.cache_hit(key, depth)
+            return self.container.singletons[key]
+
+        if (item := self.container.container.get(key)) is None:
+            key = self.resolve_key(key)
+            item = self.container.get(key)
+
+        if item.kind is ItemKind.INSTANCE:
             return item.instance
 
+        if item.cache is not None:
+            return await self.aget_with_policy(key, item, depth)
+
+        # Validated graphs are known to be acyclic, so aren't tracked
+        if active is not None and key in active:
+            raise CircularDependencyError(key, cycle_path(active, key))
+
+        # Compiled before claiming the build, so an unfillable parameter doesn't
+        # leave waiters waiting on it
+        plan = self.get_plan(key, item)
+
+        pending = shared = None
+        if item.use_cache:
+            instance = self.container.cache.get(key, NOT_CACHED)
+            if instance is not NOT_CACHED:
+                if (hooks := self.instrumentation) is not None:
+                    hooks.cache_hit(key, depth)
+                return instance
+
+            lookup = partial(self.container.cache.get, key, NOT_CACHED)
+            claim = await self.aclaim(self.claim_key(key), key, depth, lookup)
+            if not isinstance(claim, PendingResolution):
+                return claim
+            pending = claim
+
+            # Cached instances outlive the scope, so are torn down with the
+            # container, as are their dependencies
+            scope = None
+            resolutions = None if resolutions is None else {}
+        elif resolutions is not None:
+            # Share dependencies already being built elsewhere in the tree
+            while (shared := resolutions.get(key)) is not None:
+                if (instance := await shared.wait()) is not ABANDONED:
+                    if (hooks := self.instrumentation) is not None:
+                        hooks.cache_hit(key, depth)
+                    return instance
+            shared = resolutions[key] = PendingResolution()
+
+        if plan.is_leaf and pending is None and shared is None:
+            return await self.aconstruct(key, plan, leaf_factory(plan), depth, scope)
+
+        frame = Frame(key, plan, {}, 0, None, pending, 0.0, scope, resolutions, shared)
+        if plan.is_leaf:
+            target = CacheEntry() if pending is not None else scope
+            try:
+                instance = await self.aconstruct(
+                    key, plan, leaf_factory(plan), depth, target
+                )
+            except BaseException as e:
+                self.fail_frame(frame, e)
+                raise
+
+            self.finish_frame(frame, instance, target)
+            return instance
+
+        frames.append(frame)
+        if active is not None:
+            active[key] = None
+        if self.concurrent:
+            await self.afan_out(
+                plan.parameters, frame.kwargs, scope, resolutions, active, depth + 1
+            )
+        return PUSHED
+
+    def finish_frame(
+        self, frame: Frame, instance: Instance, target: Scope | CacheEntry | None
+    ):
+        if frame.pending is not None:
+            self.container.set_cached(frame.key, instance, target)
+            self.finish_claim(self.claim_key(frame.key), frame.pending, instance)
+        elif frame.shared is not None:
+            frame.shared.set(instance)
+
+    def fail_frame(self, frame: Frame, error: BaseException):
+        if frame.pending is not None:
+            self.fail_claim(self.claim_key(frame.key), frame.pending, error)
+        elif frame.shared is not None:
+            if not isinstance(error, Exception):
+                # Let a waiter take over, rather than keep the failure
+                del frame.resolutions[frame.key]
+            frame.shared.fail(error)
+
+    async def afan_out(
+        self,
+        parameters: list[PlanParameter],
+        kwargs: dict[str, Instance],
+        scope: Scope | None,
+        resolutions: Resolutions | None,
+        active: dict[ContainerKey, None] | None,
+        depth: int,
+    ):
+        """Resolve sibling dependencies that may wait, e.g. on I/O, in tasks
+
+        Sync leaves don't wait on anything, so a task would only add overhead,
+        and are left for the caller to resolve.
+        """
+
+        spawned = [
+            param
+            for param in parameters
+            if param.dependency is not None
+            and not param.lazy
+            and not param.collection
+            and not self.is_inline_leaf(param.dependency)
+        ]
+        if len(spawned) < 2:
+            return
+
+        async def resolve(param: PlanParameter):
+            # Each task walks its own branch, so has its own copy of the keys
+            kwargs[param.name] = await self.aresolve(
+                param.dependency,
+                scope,
+                resolutions,
+                None if active is None else dict(active),
+                depth,
+            )
+
         try:
-            assert isinstance(
-                item, (DefinedFactoryContainerItem, PartialFactoryContainerItem)
+            async with anyio.create_task_group() as tg:
+                for param in spawned:
+                    tg.start_soon(resolve, param)
+        except BaseExceptionGroup as eg:
+            # Surface the original error when only one branch failed
+            if len(eg.exceptions) == 1:
+                raise eg.exceptions[0]
+            raise
+
+    def claim_key(self, key: ContainerKey) -> Hashable:
+        """Key of a cached item's build, as children share their parent's builds"""
+
+        return self.container.owner(key), key
+
+    async def aclaim(
+        self,
+        cache_key: Hashable,
+        key: ContainerKey,
+        depth: int,
+        lookup: Callable[[], Instance],
+    ) -> Instance | PendingResolution:
+        """Wait for the instance another task is building, or claim building it
+
+        Once claimed, returns a PendingResolution the caller must finish or fail.
+        """
+
+        while (pending := self.pending.get(cache_key)) is not None:
+            # Waiting on our own construction would never finish
+            if pending.task_id == anyio.get_current_task().id:
+                raise CircularDependencyError(key)
+            if (instance := await pending.wait()) is ABANDONED:
+                # Its builder was cancelled, so another waiter may have taken
+                # over already, or this one does
+                instance = lookup()
+            if instance is not NOT_CACHED and instance is not ABANDONED:
+                if (hooks := self.instrumentation) is not None:
+                    hooks.cache_hit(key, depth)
+                return instance
+
+        if (hooks := self.instrumentation) is not None:
+            hooks.cache_miss(key, depth)
+        pending = self.pending[cache_key] = PendingResolution()
+        return pending
+
+    def finish_claim(
+        self, cache_key: Hashable, pending: PendingResolution, instance: Instance
+    ):
+        del self.pending[cache_key]
+        pending.set(instance)
+
+    def fail_claim(
+        self, cache_key: Hashable, pending: PendingResolution, error: BaseException
+    ):
+        del self.pending[cache_key]
+        pending.fail(error)
+
+    def construct(
+        self,
+        key: ContainerKey,
+        plan: ResolutionPlan,
+        factory: Factory,
+        depth: int,
+        scope: CacheEntry | None = None,
+    ) -> Instance:
+        if (hooks := self.instrumentation) is None:
+            return self.call_factory(factory, plan.is_coroutine, scope)
+
+        started = time.perf_counter()
+        instance = self.call_factory(factory, plan.is_coroutine, scope)
+        hooks.factory(key, depth, time.perf_counter() - started)
+        return instance
+
+    async def aconstruct(
+        self,
+        key: ContainerKey,
+        plan: ResolutionPlan,
+        factory: Factory,
+        depth: int,
+        scope: Scope | CacheEntry | None = None,
+    ) -> Instance:
+        if (hooks := self.instrumentation) is None:
+            return await self.acall_factory(
+                factory, plan.is_coroutine, scope, execution=plan.execution
+            )
+
+        on_exit = hooks.teardown_callback(key, depth) if scope is not None else None
+        started = time.perf_counter()
+        instance = await self.acall_factory(
+            factory, plan.is_coroutine, scope, on_exit, plan.execution
+        )
+        hooks.factory(key, depth, time.perf_counter() - started)
+        return instance
+
+    def get_with_policy(
+        self,
+        key: ContainerKey,
+        item: ContainerItem,
+        depth: int,
+        instance_key: Hashable | None = None,
+    ) -> Instance:
+        """Return the instance cached by the item's policy, or construct it"""
+
+        cache_key = self.policy_key(key, item, instance_key)
+        policy = item.cache
+        hooks = self.instrumentation
+        if (entry := policy.get(cache_key)) is None:
+            lock = self.locks.get(cache_key) or self.locks.setdefault(
+                cache_key, threading.RLock()
+            )
+            with lock:
+                if (entry := policy.get(cache_key)) is None:
+                    # Only this thread can hold the lock, so it's a cycle
+                    if cache_key in self.building.keys:
+                        raise CircularDependencyError(key)
+
+                    if hooks is not None:
+                        hooks.cache_miss(key, depth)
+                    try:
+                        entry = self.build_entry(key, item, instance_key)
+                        policy.set(cache_key, entry)
+                    finally:
+                        # As for cached items, rather than keep one per key
+                        if self.locks.get(cache_key) is lock:
+                            del self.locks[cache_key]
+                elif hooks is not None:
+                    hooks.cache_hit(key, depth)
+        else:
+            if hooks is not None:
+                hooks.cache_hit(key, depth)
+            if policy.should_refresh(entry):
+                self.refresher.submit(self.refresh, key, item, entry, instance_key)
+
+        if policy.evicted:
+            self.close_evicted(policy)
+        return entry.instance
+
+    def build_entry(
+        self,
+        key: ContainerKey,
+        item: ContainerItem,
+        instance_key: Hashable | None = None,
+    ) -> CacheEntry:
+        plan = self.get_plan(key, item)
+        entry = CacheEntry()
+
+        cache_key = self.policy_key(key, item, instance_key)
+        building = self.building.keys
+        building.add(cache_key)
+        try:
+            factory = self.bind(keyed_factory(plan, instance_key), plan.parameters)
+            entry.instance = self.call_factory(factory, plan.is_coroutine, entry)
+        finally:
+            building.discard(cache_key)
+
+        return entry
+
+    def refresh(
+        self,
+        key: ContainerKey,
+        item: ContainerItem,
+        stale: CacheEntry,
+        instance_key: Hashable | None = None,
+    ):
+        try:
+            entry = self.build_entry(key, item, instance_key)
+            item.cache.set(self.policy_key(key, item, instance_key), entry)
+        except Exception:
+            # Keep serving the stale entry until it expires, then retry
+            logger.exception("Failed to refresh %s", key)
+            stale.refreshing = False
+        finally:
+            self.close_evicted(item.cache)
+
+    def policy_key(
+        self,
+        key: ContainerKey,
+        item: ContainerItem,
+        instance_key: Hashable | None = None,
+    ) -> Hashable:
+        """The key of an item's instance in its cache policy
+
+        Children share their parent's policies, so instances a child caches
+        itself are keyed by the child, as their builds are.
+        """
+
+        cache_key = cached_key(key, item, instance_key)
+        if (owner := self.container.owner(key)).parent is None:
+            return cache_key
+        return owner, cache_key
+
+    def close_evicted(self, policy: CachePolicy):
+        """Tear down evicted instances, as closing the container would"""
+
+        for entry in policy.pop_evicted():
+            try:
+                entry.finalize()
+            except Exception:
+                logger.exception("Failed to tear down an evicted instance")
+
+    async def aget_with_policy(
+        self,
+        key: ContainerKey,
+        item: ContainerItem,
+        depth: int,
+        instance_key: Hashable | None = None,
+    ) -> Instance:
+        """Return the instance cached by the item's policy, or construct it"""
+
+        cache_key = self.policy_key(key, item, instance_key)
+        policy = item.cache
+        hooks = self.instrumentation
+        if (entry := policy.get(cache_key)) is not None:
+            if hooks is not None:
+                hooks.cache_hit(key, depth)
+            if self.task_group is not None and policy.should_refresh(entry):
+                refresh = partial(self.arefresh, key, item, entry, instance_key)
+                self.task_group.start_soon(refresh)
+        else:
+
+            def lookup() -> Instance:
+                entry = policy.get(cache_key)
+                return entry.instance if entry is not None else NOT_CACHED
+
+            claim = await self.aclaim(cache_key, key, depth, lookup)
+            if not isinstance(claim, PendingResolution):
+                return claim
+
+            try:
+                entry = await self.abuild_entry(key, item, instance_key)
+            except BaseException as e:
+                self.fail_claim(cache_key, claim, e)
+                raise
+            policy.set(cache_key, entry)
+            self.finish_claim(cache_key, claim, entry.instance)
+
+        if policy.evicted:
+            await self.aclose_evicted(policy)
+        return entry.instance
+
+    async def abuild_entry(
+        self,
+        key: ContainerKey,
+        item: ContainerItem,
+        instance_key: Hashable | None = None,
+    ) -> CacheEntry:
+        plan = self.get_plan(key, item)
+        entry = CacheEntry()
+        factory = await self.abind(
+            keyed_factory(plan, instance_key),
+            plan.parameters,
+            None,
+            self.shared_resolutions(None),
+            self.active_keys(key),
+        )
+        entry.instance = await self.acall_factory(
+            factory, plan.is_coroutine, entry, execution=plan.execution
+        )
+        return entry
+
+    async def arefresh(
+        self,
+        key: ContainerKey,
+        item: ContainerItem,
+        stale: CacheEntry,
+        instance_key: Hashable | None = None,
+    ):
+        try:
+            entry = await self.abuild_entry(key, item, instance_key)
+            item.cache.set(self.policy_key(key, item, instance_key), entry)
+        except Exception:
+            logger.exception("Failed to refresh %s", key)
+            stale.refreshing = False
+        except BaseException:
+            stale.refreshing = False
+            raise
+        finally:
+            await self.aclose_evicted(item.cache)
+
+    async def aclose_evicted(self, policy: CachePolicy):
+        for entry in policy.pop_evicted():
+            try:
+                await entry.afinalize()
+            except Exception:
+                logger.exception("Failed to tear down an evicted instance")
+
+    def get_keyed(self, key: ContainerKey, instance_key: Hashable) -> Instance:
+        """Resolve the instance of a keyed factory for the key
+
+        Items that aren't keyed, such as overrides of keyed items, resolve as
+        usual.
+        """
+
+        if (overrides := OVERRIDES.get()) is not None and self in overrides:
+            return overrides[self].resolver.get_keyed(key, instance_key)
+
+        if self.container.parent is not None:
+            self.localize()
+
+        key = self.resolve_key(key)
+        item = self.container.get(key)
+        if item.kind is ItemKind.INSTANCE or not item.keyed:
+            return self.get(key)
+
+        # Built for each resolution while a dependency is overridden
+        if item.cache is None:
+            plan = self.get_plan(key, item)
+            factory = self.bind(keyed_factory(plan, instance_key), plan.parameters)
+            return self.call_factory(factory, plan.is_coroutine)
+
+        return self.get_with_policy(key, item, 0, instance_key)
+
+    async def aget_keyed(
+        self, key: ContainerKey, instance_key: Hashable, scope: Scope | None = None
+    ) -> Instance:
+        """Resolve the instance of a keyed factory for the key"""
+
+        if (overrides := OVERRIDES.get()) is not None and self in overrides:
+            resolver = overrides[self].resolver
+            return await resolver.aget_keyed(key, instance_key, scope)
+
+        if self.container.parent is not None:
+            self.localize()
+
+        key = self.resolve_key(key)
+        item = self.container.get(key)
+        if item.kind is ItemKind.INSTANCE or not item.keyed:
+            return await self.aget(key, scope)
+
+        if item.cache is None:
+            plan = self.get_plan(key, item)
+            factory = await self.abind(
+                keyed_factory(plan, instance_key),
+                plan.parameters,
+                scope,
+                self.shared_resolutions(scope),
+                self.active_keys(key),
+            )
+            return await self.acall_factory(
+                factory, plan.is_coroutine, scope, execution=plan.execution
             )
-            factory = self.build_factory_from_factory(item.factory)
-            return self.call_factory(factory)
-        except RecursionError:
-            # TODO: Detect this earlier
-            raise CircularDependencyError(key)
 
-    def call_factory(self, factory: Factory) -> Instance:
-        if inspect.iscoroutinefunction(factory):
-            return asyncer.syncify(factory)()
+        return await self.aget_with_policy(key, item, 0, instance_key)
 
-        result = factory()
+    def get_all(self, type_: InstanceType) -> list[Instance]:
+        """Resolve every item registered as the type, or implementing it"""
 
-        if isinstance(result, AsyncGenerator):
+        return [self.get(key) for key in self.container.lookup_all(type_)]
 
-            async def get_next_item(g: AsyncGenerator) -> Instance:
-                async for item in g:
-                    return item
+    async def aget_all(
+        self, type_: InstanceType, scope: Scope | None = None
+    ) -> list[Instance]:
+        """Resolve every item registered as the type, building async ones together"""
 
-            return asyncer.syncify(get_next_item)(result)
+        keys = self.container.lookup_all(type_)
+        if len(keys) < 2 or not any(self.is_async(key) for key in keys):
+            return [await self.aget(key, scope) for key in keys]
+
+        instances = [None] * len(keys)
+
+        async def resolve(index: int, key: ContainerKey):
+            instances[index] = await self.aget(key, scope)
+
+        try:
+            async with anyio.create_task_group() as tg:
+                for index, key in enumerate(keys):
+                    tg.start_soon(resolve, index, key)
+        except BaseExceptionGroup as eg:
+            if len(eg.exceptions) == 1:
+                raise eg.exceptions[0]
+            raise
+
+        return instances
+
+    def get_collection(
+        self, type_: InstanceType, default: Any = inspect.Parameter.empty
+    ) -> Any:
+        """Resolve every item of the type, or the default if none are registered"""
+
+        if default is not inspect.Parameter.empty and not self.container.lookup_all(
+            type_
+        ):
+            return default
+        return self.get_all(type_)
+
+    async def aget_collection(
+        self,
+        type_: InstanceType,
+        scope: Scope | None = None,
+        default: Any = inspect.Parameter.empty,
+    ) -> Any:
+        if default is not inspect.Parameter.empty and not self.container.lookup_all(
+            type_
+        ):
+            return default
+        return await self.aget_all(type_, scope)
+
+    def is_async(self, key: ContainerKey) -> bool:
+        item = self.container.get(key)
+        if item.kind is ItemKind.INSTANCE:
+            return False
+        return inspect.iscoroutinefunction(item.factory) or inspect.isasyncgenfunction(
+            item.factory
+        )
+
+    def is_inline_leaf(self, key: ContainerKey) -> bool:
+        item = self.container.container.get(key)
+        if item is None or item.kind is ItemKind.INSTANCE:
+            return item is not None
+        # Policies may wait on another task building the instance
+        return item.cache is None and self.get_plan(key, item).is_inline_leaf
+
+    def resolve_key(self, key: ContainerKey) -> ContainerKey:
+        if key in self.container:
+            return key
+
+        # If the key is not in the container, attempt to autowire it
+        if not (key_ := self.autowire(key[0])):
+            raise KeyError(f"Unable to resolve {key}")
+
+        return key_
+
+    def dependencies(self, key: ContainerKey) -> list[ContainerKey]:
+        """Keys a container item depends on, autowiring any unregistered ones"""
+
+        item = self.container.get(key)
+        if item.kind is ItemKind.INSTANCE:
+            return []
+
+        dependencies = []
+        for param in self.get_plan(key, item).parameters:
+            if param.dependency is None or param.lazy:
+                continue
+            if param.collection:
+                dependencies.extend(self.container.lookup_all(param.dependency[0]))
+            else:
+                dependencies.append(self.resolve_key(param.dependency))
 
-        if isinstance(result, Generator):
-            return next(result)
+        return dependencies
+
+    def build_graph(
+        self, keys: Iterable[ContainerKey] | None = None
+    ) -> DependencyGraph:
+        """Walk the dependencies of the given keys, or of every container item"""
+
+        graph = DependencyGraph()
+        pending = list(self.container.container if keys is None else keys)
+        while pending:
+            key = pending.pop()
+            if key in graph.dependencies or key in graph.errors:
+                continue
+
+            try:
+                dependencies = self.dependencies(key)
+            except (KeyError, UnfillableArgumentError) as e:
+                if isinstance(e, UnfillableArgumentError) and e.dependency is None:
+                    e.dependency = key
+                graph.errors[key] = e
+                continue
+
+            graph.add(key, dependencies)
+            pending.extend(dependencies)
+
+        return graph
+
+    def validate(self) -> DependencyGraph:
+        """Check every item can be constructed, autowiring any dependencies"""
+
+        graph = self.build_graph()
+
+        for error in graph.errors.values():
+            raise error
+
+        if cycle := graph.find_cycle():
+            raise CircularDependencyError(cycle[0], cycle)
+
+        self.validated_revision = self.container.revision
+        return graph
+
+    def active_keys(self, *keys: ContainerKey) -> dict[ContainerKey, None] | None:
+        """Keys being constructed, to detect cycles, starting with the given ones"""
+
+        # Nothing has been registered since validation, so there are no cycles
+        if self.validated_revision == self.container.revision:
+            return None
+        return dict.fromkeys(keys)
+
+    def shared_resolutions(self, scope: Scope | None) -> Resolutions | None:
+        """Where to share factories built once per scope, or once per resolution"""
+
+        if scope is not None:
+            return scope.resolutions
+        return {} if self.concurrent else None
+
+    def get_plan(
+        self, key: ContainerKey, item: ContainerItem | None = None
+    ) -> ResolutionPlan:
+        if item is None:
+            item = self.container.get(key)
+
+        if (plan := item.plan) is None:
+            plan = item.plan = self.compile_plan(item)
+
+        return plan
+
+    def compile_plan(self, item: ContainerItem) -> ResolutionPlan:
+        assert item.kind is ItemKind.FACTORY
+
+        # Keyed factories are passed their key when they're called
+        skip = ("key",) if item.keyed else ()
+        parameters = self.compile_parameters(item.factory, skip)
+
+        is_coroutine = inspect.iscoroutinefunction(item.factory)
+        is_leaf = all(param.dependency is None for param in parameters)
+        return ResolutionPlan(
+            factory=item.factory,
+            parameters=parameters,
+            is_coroutine=is_coroutine,
+            is_leaf=is_leaf,
+            execution=item.execution,
+            is_inline_leaf=is_leaf
+            and item.execution is Execution.INLINE
+            and not is_coroutine
+            and not inspect.isasyncgenfunction(item.factory),
+        )
+
+    def call_factory(
+        self,
+        factory: Factory,
+        is_coroutine: bool | None = None,
+        scope: Scope | CacheEntry | None = None,
+    ) -> Instance:
+        if is_coroutine is None:
+            is_coroutine = inspect.iscoroutinefunction(factory)
+
+        if is_coroutine:
+            result = asyncer.syncify(factory)()
+        else:
+            result = factory()
+
+            if isinstance(result, AsyncGenerator):
+                if scope is not None:
+                    return asyncer.syncify(scope.enter_async_generator)(result)
+
+                async def get_next_item(g: AsyncGenerator) -> Instance:
+                    async for item in g:
+                        return item
+
+                return asyncer.syncify(get_next_item)(result)
+
+            if isinstance(result, Generator):
+                if scope is not None:
+                    return scope.enter_generator(result)
+                return next(result)
+
+        # Context managers are only entered when they'll be exited, otherwise
+        # they're injected as they are
+        if scope is None:
+            return result
+
+        if isinstance(result, AbstractAsyncContextManager):
+            return asyncer.syncify(scope.enter_async_context)(result)
+
+        if isinstance(result, AbstractContextManager):
+            return scope.enter_context(result)
 
         return result
 
+    async def acall_factory(
+        self,
+        factory: Factory,
+        is_coroutine: bool | None = None,
+        scope: Scope | CacheEntry | None = None,
+        on_exit: Callable[[float], None] | None = None,
+        execution: Execution = Execution.INLINE,
+    ) -> Instance:
+        if is_coroutine is None:
+            is_coroutine = inspect.iscoroutinefunction(factory)
+
+        if is_coroutine:
+            result = await factory()
+        elif execution is Execution.THREAD:
+            # Generators and context managers may block entering, so are
+            # entered in the thread too
+            return await self.arun_blocking(
+                execution, self.call_factory, factory, False, scope
+            )
+        elif execution is Execution.PROCESS:
+            result = await self.arun_blocking(execution, factory)
+        else:
+            result = factory()
+
+            # Generators are held open until the scope closes, to run their teardown
+            if isinstance(result, AsyncGenerator):
+                if scope is not None:
+                    return await scope.enter_async_generator(result, on_exit)
+                return await anext(result)
+
+            if isinstance(result, Generator):
+                if scope is not None:
+                    return scope.enter_generator(result, on_exit)
+                return next(result)
+
+        # As are context managers, injecting what they enter as. Without a
+        # scope nothing would exit them, so they're injected as they are.
+        if scope is None:
+            return result
+
+        if isinstance(result, AbstractAsyncContextManager):
+            return await scope.enter_async_context(result, on_exit)
+
+        if isinstance(result, AbstractContextManager):
+            return scope.enter_context(result, on_exit)
+
+        return result
+
+    async def arun_blocking(
+        self, execution: Execution, function: Callable, *args: Any
+    ) -> Any:
+        """Run a function in a worker thread or process, bounded by the limiter"""
+
+        if execution is Execution.PROCESS:
+            return await anyio.to_process.run_sync(
+                function, *args, limiter=self.limiter
+            )
+        return await anyio.to_thread.run_sync(function, *args, limiter=self.limiter)
+
     def build_factory_from_factory(self, factory: Factory) -> Factory:
         return self.build_factory_dependencies(factory)
 
     def build_factory_dependencies(self, factory: Factory) -> Factory:
-        args = inspect.signature(factory)
+        return self.bind(factory, self.compile_parameters(factory))
 
+    def bind(self, factory: Factory, parameters: list[PlanParameter]) -> Factory:
         params = {}
+        for param in parameters:
+            if param.dependency is None:
+                params[param.name] = param.default
+            elif param.lazy:
+                params[param.name] = Lazy(self, param.dependency)
+            elif param.collection:
+                params[param.name] = self.get_collection(
+                    param.dependency[0], param.default
+                )
+            else:
+                params[param.name] = self.get(param.dependency)
+
+        return partial(factory, **params)
+
+    async def abind(
+        self,
+        factory: Factory,
+        parameters: list[PlanParameter],
+        scope: Scope | None,
+        resolutions: Resolutions | None,
+        active: dict[ContainerKey, None] | None,
+        depth: int = 0,
+    ) -> Factory:
+        params = {}
+        if self.concurrent:
+            await self.afan_out(parameters, params, scope, resolutions, active, depth)
+
+        for param in parameters:
+            if param.name in params:
+                continue
+            if param.dependency is None:
+                params[param.name] = param.default
+            elif param.lazy:
+                params[param.name] = Lazy(self, param.dependency, scope)
+            elif param.collection:
+                params[param.name] = await self.aget_collection(
+                    param.dependency[0], scope, param.default
+                )
+            else:
+                params[param.name] = await self.aresolve(
+                    param.dependency, scope, resolutions, active, depth
+                )
+
+        return partial(factory, **params)
+
+    def compile_parameters(
+        self, factory: Factory, skip: Collection[str] = ()
+    ) -> list[PlanParameter]:
+        args = inspect.signature(factory)
+        hints = self.type_hints(factory)
+
+        params = []
         for name, param in args.parameters.items():
+            if name in skip:
+                continue
+
+            annotation = hints.get(name, param.annotation)
+
             # Attempt to fetch/autowire dependencies
-            if param.annotation is not inspect.Parameter.empty:
-                if isinstance(param.annotation, str):
-                    raise NotImplementedError(
-                        "String annotations are not supported yet"
-                    )
+            if annotation is not inspect.Parameter.empty and not isinstance(
+                annotation, str
+            ):
+                param = param.replace(annotation=annotation)
+                annotation = unwrap_annotated(param.annotation)
+                if (origin := get_origin(annotation)) is Lazy:
+                    key = (get_args(annotation)[0], None)
+                    params.append(PlanParameter(name, key, lazy=True))
+                    continue
+
+                # Only collections of classes that can be registered are
+                # injected, others (e.g. list[str]) are filled by their default
+                if origin in COLLECTIONS:
+                    if is_collectable(element := get_args(annotation)[0]):
+                        key = (element, None)
+                        params.append(
+                            PlanParameter(name, key, param.default, collection=True)
+                        )
+                        continue
 
-                if is_class_type(param.annotation):
+                elif is_class_type(param.annotation):
                     anno_args = get_args(param.annotation)
                     if len(anno_args) > 0:
-                        params[name] = self.get((anno_args[0], None))
+                        params.append(PlanParameter(name, (anno_args[0], None)))
                         continue
 
-                    params[name] = self.get((param.annotation, None))
+                    params.append(PlanParameter(name, (param.annotation, None)))
                     continue
 
             # Use default values
             if param.default is not inspect.Parameter.empty:
-                params[name] = param.default
+                params.append(PlanParameter(name, None, param.default))
                 continue
 
-            raise UnfillableArgumentError(name, param.annotation)
+            raise UnfillableArgumentError(name, annotation)
 
-        return partial(factory, **params)
+        return params
+
+    def type_hints(self, factory: Factory) -> dict[str, Any]:
+        """Evaluated annotations of the factory's parameters, cached per factory"""
+
+        try:
+            return self.hints[factory]
+        except KeyError:
+            hints = self.hints[factory] = evaluate_type_hints(factory)
+            return hints
+        except TypeError:
+            # Unhashable callables aren't cached
+            return evaluate_type_hints(factory)
 
     def autowire(self, type_: InstanceType) -> ContainerKey | None:
         if not self.can_autowire(type_):
             return None
 
-        return self.container.register_factory(type_)
+        # Unfillable classes aren't registered, and fail again without being
+        # inspected again
+        failures = self.autowire_policy.failures
+        if (failure := failures.get(type_)) is not None:
+            raise UnfillableArgumentError(failure.arg_name, failure.arg_type)
+
+        item = PartialFactoryContainerItem(
+            factory=type_, use_cache=False, autowired=True
+        )
+        try:
+            item.plan = self.compile_plan(item)
+        except UnfillableArgumentError as e:
+            failures[type_] = e
+            raise
+
+        return self.container.register_autowired(item)
 
     def can_autowire(self, type_: InstanceType) -> bool:
-        return is_class_type(type_)
+        return self.autowire_policy.can_autowire(type_)
 
 
 class ResolverError(RuntimeError): ...
@@ -129,15 +1652,32 @@ class UnfillableArgumentError(ResolverError):
 
     def __str__(self) -> str:
         return f"Unable to fill parameter {self.arg_name} ({self.arg_type})" + (
-            " for {self.dependency}" if self.dependency else ""
+            f" for {describe_key(self.dependency)}" if self.dependency else ""
         )
 
 
 class CircularDependencyError(ResolverError):
     dependency: ContainerKey
+    path: list[ContainerKey] | None
+
+    def __init__(
+        self, dependency: ContainerKey, path: list[ContainerKey] | None = None
+    ):
+        self.dependency = dependency
+        self.path = path
+
+    def __str__(self) -> str:
+        message = f"Cannot construct {self.dependency} due to a circular dependency"
+        if self.path:
+            message += ": " + " -> ".join(map(describe_key, self.path))
+        return message
+
+
+class MissingKeyError(ResolverError):
+    dependency: ContainerKey
 
     def __init__(self, dependency: ContainerKey):
         self.dependency = dependency
 
     def __str__(self) -> str:
-        return f"Cannot construct {self.dependency} due to a circular dependency"
+        return f"{describe_key(self.dependency)} is keyed, so needs a key to resolve"
@@ -0,0 +1,153 @@
+import time
+from contextlib import (
+    AbstractAsyncContextManager,
+    AbstractContextManager,
+    AsyncExitStack,
+    asynccontextmanager,
+    contextmanager,
+)
+from collections.abc import Callable
+from typing import AsyncGenerator, Generator
+
+import anyio
+
+from dipin.container import ContainerKey, Instance
+
+
+# Returned to waiters when the task constructing an instance was cancelled
+ABANDONED = object()
+
+
+class PendingResolution:
+    """An instance being constructed, that other tasks can wait for"""
+
+    event: anyio.Event
+    task_id: int
+    instance: Instance | None
+    error: BaseException | None
+    abandoned: bool
+
+    def __init__(self):
+        self.event = anyio.Event()
+        self.task_id = anyio.get_current_task().id
+        self.instance = None
+        self.error = None
+        self.abandoned = False
+
+    def set(self, instance: Instance):
+        self.instance = instance
+        self.event.set()
+
+    def fail(self, error: BaseException):
+        # Cancellation belongs to the constructing task, so waiters retry
+        # rather than being cancelled too
+        if isinstance(error, Exception):
+            self.error = error
+        else:
+            self.abandoned = True
+        self.event.set()
+
+    async def wait(self) -> Instance:
+        if not self.event.is_set():
+            await self.event.wait()
+        if self.error is not None:
+            raise self.error
+        if self.abandoned:
+            return ABANDONED
+        return self.instance
+
+
+Resolutions = dict[ContainerKey, PendingResolution]
+
+
+# Called with the number of seconds a teardown took
+ExitCallback = Callable[[float], None]
+
+
+class Scope:
+    """Keeps factory results and their teardowns for the lifetime of a request"""
+
+    resolutions: Resolutions
+    exit_stack: AsyncExitStack
+
+    def __init__(self):
+        self.resolutions = {}
+        self.exit_stack = AsyncExitStack()
+
+    def enter_generator(
+        self, generator: Generator, on_exit: ExitCallback | None = None
+    ) -> Instance:
+        return self.enter_context(generator_context(generator), on_exit)
+
+    async def enter_async_generator(
+        self, generator: AsyncGenerator, on_exit: ExitCallback | None = None
+    ) -> Instance:
+        context = async_generator_context(generator)
+        return await self.enter_async_context(context, on_exit)
+
+    def enter_context(
+        self, context: AbstractContextManager, on_exit: ExitCallback | None = None
+    ) -> Instance:
+        if on_exit is not None:
+            context = TimedExit(context, on_exit)
+        return self.exit_stack.enter_context(context)
+
+    async def enter_async_context(
+        self, context: AbstractAsyncContextManager, on_exit: ExitCallback | None = None
+    ) -> Instance:
+        if on_exit is not None:
+            context = AsyncTimedExit(context, on_exit)
+        return await self.exit_stack.enter_async_context(context)
+
+    async def aclose(self):
+        self.resolutions.clear()
+        await self.exit_stack.aclose()
+
+    async def __aenter__(self) -> "Scope":
+        return self
+
+    async def __aexit__(self, *exc_info) -> bool:
+        self.resolutions.clear()
+        return await self.exit_stack.__aexit__(*exc_info)
+
+
+def generator_context(generator: Generator) -> AbstractContextManager:
+    """Runs the code after a generator's yield when the context exits"""
+
+    return contextmanager(lambda: generator)()
+
+
+def async_generator_context(generator: AsyncGenerator) -> AbstractAsyncContextManager:
+    return asynccontextmanager(lambda: generator)()
+
+
+class TimedExit(AbstractContextManager):
+    def __init__(self, context: AbstractContextManager, on_exit: ExitCallback):
+        self.context = context
+        self.on_exit = on_exit
+
+    def __enter__(self) -> Instance:
+        return self.context.__enter__()
+
+    def __exit__(self, *exc_info) -> bool | None:
+        started = time.perf_counter()
+        try:
+            return self.context.__exit__(*exc_info)
+        finally:
+            self.on_exit(time.perf_counter() - started)
+
+
+class AsyncTimedExit(AbstractAsyncContextManager):
+    def __init__(self, context: AbstractAsyncContextManager, on_exit: ExitCallback):
+        self.context = context
+        self.on_exit = on_exit
+
+    async def __aenter__(self) -> Instance:
+        return await self.context.__aenter__()
+
+    async def __aexit__(self, *exc_info) -> bool | None:
+        started = time.perf_counter()
+        try:
+            return await self.context.__aexit__(*exc_info)
+        finally:
+            self.on_exit(time.perf_counter() - started)
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from dipin import Lazy
+from dipin.interface import ResolvingContainer
+from dipin.resolver import Resolver
+
+
+class Settings: ...
+
+
+class Engine:
+    def __init__(self, settings: Settings):
+        self.settings = settings
+
+
+class Node:
+    def __init__(self, parent: Lazy[Node], settings: Settings):
+        self.parent = parent
+        self.settings = settings
+
+
+class Handler: ...
+
+
+class Dispatcher:
+    def __init__(self, handlers: list[Handler], retries: int = 3):
+        self.handlers = handlers
+        self.retries = retries
+
+
+def create_engine(settings: Settings) -> Engine:
+    return Engine(settings)
+
+
+def test_postponed_annotations_are_autowired():
+    DI = ResolvingContainer()
+
+    engine = DI.get(Engine)
+
+    assert isinstance(engine.settings, Settings)
+
+
+def test_postponed_annotations_of_factory_functions():
+    DI = ResolvingContainer()
+    DI.register_factory(Engine, create_engine)
+
+    assert isinstance(DI.get(Engine).settings, Settings)
+
+
+def test_postponed_annotations_referring_to_the_class():
+    DI = ResolvingContainer()
+
+    node = DI.get(Node)
+
+    assert isinstance(node.parent.get(), Node)
+
+
+def test_postponed_annotations_of_collections_and_defaults():
+    DI = ResolvingContainer()
+    DI.register_factory(Handler)
+
+    dispatcher = DI.get(Dispatcher)
+
+    assert [type(handler) for handler in dispatcher.handlers] == [Handler]
+    assert dispatcher.retries == 3
+
+
+def test_type_hints_are_evaluated_once_per_factory():
+    resolver = Resolver(ResolvingContainer().container)
+
+    hints = resolver.type_hints(Engine)
+
+    assert hints == {"settings": Settings}
+    assert resolver.type_hints(Engine) is hints
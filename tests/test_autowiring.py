@@ -1,7 +1,12 @@
+from abc import ABC, abstractmethod
+from typing import Protocol
+
 import pytest
 
+from dipin.autowire import AutowirePolicy
+from dipin.container import Container
 from dipin.interface import ResolvingContainer
-from dipin.resolver import UnfillableArgumentError
+from dipin.resolver import Resolver, UnfillableArgumentError
 
 
 def test_autowiring_of_unregistered_dependencies():
@@ -53,3 +58,78 @@ def test_autowiring_of_unregistered_dependency_with_non_type_arg():
         DI.get(Service)
 
     assert str(e.value) == "Unable to fill parameter api_token (<class 'str'>)"
+
+
+def test_autowiring_failures_are_memoized_without_registering(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    class Service:
+        def __init__(self, api_token: str): ...
+
+    class Handler:
+        def __init__(self, service: Service): ...
+
+    DI = ResolvingContainer()
+
+    with pytest.raises(UnfillableArgumentError):
+        DI.get(Handler)
+
+    assert Service not in DI
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Failed classes should not be inspected again")
+
+    monkeypatch.setattr("dipin.resolver.inspect.signature", fail)
+
+    with pytest.raises(UnfillableArgumentError) as e:
+        DI.get(Handler)
+
+    assert e.value.arg_name == "api_token"
+
+
+class Repository(ABC):
+    @abstractmethod
+    def find(self): ...
+
+
+class Closeable(Protocol):
+    def close(self): ...
+
+
+@pytest.mark.parametrize("type_", [Repository, Closeable, list[str], str])
+def test_autowiring_rejects_non_concrete_classes(type_):
+    DI = ResolvingContainer()
+
+    with pytest.raises(KeyError):
+        DI.get(type_)
+
+    assert len(DI) == 0
+
+
+def test_autowiring_module_allowlist():
+    class Service: ...
+
+    policy = AutowirePolicy(modules=["app"])
+    DI = ResolvingContainer(resolver=Resolver(Container(), autowire_policy=policy))
+
+    with pytest.raises(KeyError):
+        DI.get(Service)
+
+    assert policy.can_autowire(type("Service", (), {"__module__": "app.services"}))
+    assert not policy.can_autowire(type("Service", (), {"__module__": "application"}))
+
+
+def test_autowiring_decisions_are_memoized(monkeypatch: pytest.MonkeyPatch):
+    class Service: ...
+
+    policy = AutowirePolicy()
+    assert policy.can_autowire(Service)
+    assert not policy.can_autowire(Repository)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Decisions should not be made again")
+
+    monkeypatch.setattr(policy, "is_eligible", fail)
+
+    assert policy.can_autowire(Service)
+    assert not policy.can_autowire(Repository)
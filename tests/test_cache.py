@@ -0,0 +1,202 @@
+import threading
+
+import pytest
+
+from dipin.cache import LRU, TTL, RefreshAhead
+from dipin.interface import ResolvingContainer
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Credentials:
+    def __init__(self):
+        self.closed = False
+
+
+def test_ttl_policy_rebuilds_expired_instances_and_tears_them_down():
+    clock = Clock()
+    built = []
+
+    def create_credentials():
+        credentials = Credentials()
+        built.append(credentials)
+        yield credentials
+        credentials.closed = True
+
+    DI = ResolvingContainer()
+    DI.register_factory(Credentials, create_credentials, cache=TTL(60, clock=clock))
+
+    first = DI.get(Credentials)
+    clock.now = 59
+    assert DI.get(Credentials) is first
+    assert not first.closed
+
+    clock.now = 60
+    second = DI.get(Credentials)
+    assert second is not first
+    assert first.closed
+    assert not second.closed
+    assert len(built) == 2
+
+
+def test_lru_policy_shared_between_registrations_evicts_least_recently_used():
+    class Client: ...
+
+    policy = LRU(maxsize=2)
+    DI = ResolvingContainer()
+    for tenant in ("a", "b", "c"):
+        DI.register_factory(Client, name=tenant, cache=policy)
+
+    a = DI.get("a")
+    DI.get("b")
+    assert DI.get("a") is a
+
+    DI.get("c")
+    assert len(policy) == 2
+    assert (Client, "b") not in policy.entries
+    assert DI.get("a") is a
+
+
+def test_refresh_ahead_policy_rebuilds_in_the_background():
+    clock = Clock()
+    refreshing = threading.Event()
+    built = []
+
+    def create_credentials() -> Credentials:
+        if built:
+            refreshing.wait(1)
+        built.append(Credentials())
+        return built[-1]
+
+    policy = RefreshAhead(60, refresh_after=45, clock=clock)
+    DI = ResolvingContainer()
+    DI.register_factory(Credentials, create_credentials, cache=policy)
+
+    first = DI.get(Credentials)
+    clock.now = 50
+    # The stale instance is returned while it's rebuilt
+    assert DI.get(Credentials) is first
+    assert DI.get(Credentials) is first
+    refreshing.set()
+
+    for _ in range(100):
+        if DI.get(Credentials) is not first:
+            break
+        threading.Event().wait(0.01)
+
+    assert DI.get(Credentials) is built[1]
+    assert len(built) == 2
+
+
+def test_refresh_ahead_policy_rebuilds_expired_instances_while_refreshing():
+    clock = Clock()
+    started = threading.Event()
+    refreshing = threading.Event()
+    built = []
+
+    def create_credentials() -> Credentials:
+        built.append(Credentials())
+        if len(built) == 2:
+            started.set()
+            refreshing.wait(1)
+        return built[-1]
+
+    policy = RefreshAhead(60, refresh_after=45, clock=clock)
+    DI = ResolvingContainer()
+    DI.register_factory(Credentials, create_credentials, cache=policy)
+
+    first = DI.get(Credentials)
+    clock.now = 50
+    assert DI.get(Credentials) is first
+    started.wait(1)
+
+    # Expired while the refresh is still building, so rebuilt by the caller
+    clock.now = 60
+    assert DI.get(Credentials) is built[2]
+    refreshing.set()
+
+
+@pytest.mark.anyio
+async def test_async_ttl_policy_tears_down_async_generators():
+    clock = Clock()
+
+    async def create_credentials():
+        credentials = Credentials()
+        yield credentials
+        credentials.closed = True
+
+    DI = ResolvingContainer()
+    DI.register_factory(Credentials, create_credentials, cache=TTL(60, clock=clock))
+
+    first = await DI.aget(Credentials)
+    assert await DI.aget(Credentials) is first
+
+    clock.now = 61
+    assert await DI.aget(Credentials) is not first
+    assert first.closed
+
+
+@pytest.mark.anyio
+async def test_async_refresh_ahead_without_task_group_rebuilds_once_expired():
+    clock = Clock()
+    DI = ResolvingContainer()
+    DI.register_factory(Credentials, cache=RefreshAhead(60, clock=clock))
+
+    first = await DI.aget(Credentials)
+    clock.now = 50
+    assert await DI.aget(Credentials) is first
+    assert await DI.aget(Credentials) is first
+
+    clock.now = 60
+    assert await DI.aget(Credentials) is not first
+
+
+def test_failed_refreshes_are_logged_and_keep_the_stale_instance(
+    caplog: pytest.LogCaptureFixture,
+):
+    clock = Clock()
+    built = []
+
+    def create_credentials() -> Credentials:
+        if len(built) == 1:
+            built.append(None)
+            raise RuntimeError("Unavailable")
+        built.append(Credentials())
+        return built[-1]
+
+    policy = RefreshAhead(60, refresh_after=45, clock=clock)
+    DI = ResolvingContainer()
+    DI.register_factory(Credentials, create_credentials, cache=policy)
+
+    first = DI.get(Credentials)
+    clock.now = 50
+    assert DI.get(Credentials) is first
+
+    for _ in range(100):
+        if "Failed to refresh" in caplog.text:
+            break
+        threading.Event().wait(0.01)
+
+    assert "Failed to refresh" in caplog.text
+    assert DI.get(Credentials) is first
+
+    # The refresh is retried once the failure is known
+    for _ in range(100):
+        if DI.get(Credentials) is not first:
+            break
+        threading.Event().wait(0.01)
+
+    assert DI.get(Credentials) is built[2]
+
+
+def test_create_once_factories_cannot_have_a_cache_policy():
+    DI = ResolvingContainer()
+
+    with pytest.raises(ValueError):
+        DI.register_factory(Credentials, create_once=True, cache=TTL(60))
@@ -0,0 +1,168 @@
+import warnings
+
+import pytest
+
+from dipin.cache import TTL
+from dipin.container import Container
+from dipin.interface import FastAPIContainer, ResolvingContainer
+
+
+class Settings:
+    def __init__(self, tenant: str = "default"):
+        self.tenant = tenant
+
+
+class Engine: ...
+
+
+class Client:
+    def __init__(self, settings: Settings, engine: Engine):
+        self.settings = settings
+        self.engine = engine
+
+
+def test_child_container_falls_through_to_parent():
+    parent = Container()
+    parent.register_factory(Settings, name="settings")
+
+    child = parent.child()
+
+    assert child.lookup("settings") == (Settings, "settings")
+    assert child.get((Settings, "settings")) is parent.get((Settings, "settings"))
+    assert len(child) == 1
+
+
+def test_child_container_registrations_dont_change_parent():
+    parent = Container()
+    parent.register_factory(Settings)
+    child = parent.child()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        child.register_instance(Settings("tenant"))
+
+    assert child.get((Settings, None)).instance.tenant == "tenant"
+    assert parent.get((Settings, None)).factory is Settings
+
+
+def test_child_container_revision_follows_parent():
+    parent = Container()
+    child = parent.child()
+    revision = child.revision
+
+    parent.register_factory(Settings)
+
+    assert child.revision != revision
+
+
+def test_child_resolving_container_overrides_dependencies():
+    DI = ResolvingContainer()
+    DI.register_instance(Settings())
+    DI.register_factory(Engine, create_once=True)
+    DI.register_factory(Client)
+    engine = DI.get(Engine)
+
+    tenant = DI.child()
+    tenant.register_instance(Settings("tenant"))
+
+    client = tenant.get(Client)
+    assert client.settings.tenant == "tenant"
+    # Instances cached by the parent are shared
+    assert client.engine is engine
+
+    assert DI.get(Client).settings.tenant == "default"
+
+
+@pytest.mark.anyio
+async def test_child_resolving_container_caches_parent_items_in_the_parent():
+    closed = []
+
+    def create_engine():
+        yield Engine()
+        closed.append(Engine)
+
+    DI = ResolvingContainer()
+    DI.register_factory(Engine, create_engine, create_once=True)
+
+    engine = DI.child().get(Engine)
+
+    assert DI.child().get(Engine) is engine
+    assert DI.get(Engine) is engine
+
+    await DI.aclose()
+    assert closed == [Engine]
+
+
+def test_child_resolving_container_caches_items_depending_on_its_registrations():
+    DI = ResolvingContainer()
+    DI.register_instance(Settings())
+    DI.register_factory(Engine, create_once=True)
+    DI.register_factory(Client, create_once=True)
+    client = DI.get(Client)
+
+    tenant = DI.child()
+    tenant.register_instance(Settings("tenant"))
+
+    tenant_client = tenant.get(Client)
+    assert tenant_client.settings.tenant == "tenant"
+    assert tenant.get(Client) is tenant_client
+    assert tenant_client.engine is client.engine
+
+    assert DI.get(Client) is client
+    assert DI.child().get(Client) is client
+    assert DI.resolver.locks == {}
+
+
+@pytest.mark.anyio
+async def test_sibling_children_cache_their_own_instances_in_shared_policies():
+    DI = ResolvingContainer()
+    DI.register_instance(Settings())
+    DI.register_instance(Engine())
+    DI.register_factory(Client, cache=TTL(60))
+
+    a = DI.child()
+    a.register_instance(Settings("a"))
+    b = DI.child()
+    b.register_instance(Settings("b"))
+
+    assert a.get(Client).settings.tenant == "a"
+    assert (await b.aget(Client)).settings.tenant == "b"
+    assert DI.get(Client).settings.tenant == "default"
+    assert a.get(Client) is a.get(Client)
+
+    client = DI.get(Client)
+    await a.aclose()
+    assert a.get(Client).settings.tenant == "a"
+    assert DI.get(Client) is client
+
+
+def test_child_resolving_container_caches_collections_its_registrations_join():
+    class Handler: ...
+
+    class AuditHandler(Handler): ...
+
+    class Dispatcher:
+        def __init__(self, handlers: list[Handler]):
+            self.handlers = handlers
+
+    DI = ResolvingContainer()
+    DI.register_factory(Handler)
+    DI.register_factory(Dispatcher, create_once=True)
+    dispatcher = DI.get(Dispatcher)
+
+    tenant = DI.child()
+    tenant.register_factory(AuditHandler)
+
+    assert len(tenant.get(Dispatcher).handlers) == 2
+    assert DI.get(Dispatcher) is dispatcher
+    # Children find the parent's dependents in its graph, rather than their own
+    assert tenant.resolver.dependents_graph is None
+
+
+def test_fastapi_child_container_keeps_native_mode():
+    DI = FastAPIContainer(native=True)
+
+    child = DI.child()
+
+    assert isinstance(child, FastAPIContainer)
+    assert child.native
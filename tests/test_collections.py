@@ -0,0 +1,184 @@
+from collections.abc import Sequence
+from typing import Protocol, runtime_checkable
+
+import anyio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from dipin.container import Container
+from dipin.interface import FastAPIContainer, ResolvingContainer
+
+
+class EventHandler:
+    def handle(self, event: str) -> str:
+        return f"{type(self).__name__}: {event}"
+
+
+class EmailHandler(EventHandler): ...
+
+
+class AuditHandler(EventHandler): ...
+
+
+class Dispatcher:
+    def __init__(self, handlers: list[EventHandler]):
+        self.handlers = handlers
+
+
+@runtime_checkable
+class Closeable(Protocol):
+    def close(self) -> None: ...
+
+
+class Connection:
+    def close(self) -> None: ...
+
+
+def test_container_indexes_items_by_base_class():
+    container = Container()
+    container.register_factory(EmailHandler)
+    container.register_factory(AuditHandler, name="audit")
+    container.register_factory(Dispatcher)
+
+    assert container.lookup_all(EventHandler) == [
+        (EmailHandler, None),
+        (AuditHandler, "audit"),
+    ]
+    assert container.lookup_all(AuditHandler) == [(AuditHandler, "audit")]
+    assert container.lookup_all(Connection) == []
+
+
+def test_container_finds_protocol_implementations():
+    container = Container()
+    container.register_factory(Connection, name="primary")
+    container.register_factory(EmailHandler)
+
+    assert container.lookup_all(Closeable) == [(Connection, "primary")]
+
+    container.register_factory(Connection, name="replica")
+    assert container.lookup_all(Closeable) == [
+        (Connection, "primary"),
+        (Connection, "replica"),
+    ]
+
+
+def test_child_container_index_doesnt_change_parent():
+    parent = Container()
+    parent.register_factory(EmailHandler)
+
+    child = parent.child()
+    child.register_factory(AuditHandler)
+
+    assert child.lookup_all(EventHandler) == [
+        (EmailHandler, None),
+        (AuditHandler, None),
+    ]
+    assert parent.lookup_all(EventHandler) == [(EmailHandler, None)]
+
+
+def test_resolving_container_injects_collections():
+    class Auditor:
+        def __init__(self, handlers: Sequence[EventHandler]):
+            self.handlers = handlers
+
+    DI = ResolvingContainer()
+    DI.register_factory(EmailHandler)
+    DI.register_factory(AuditHandler, create_once=True)
+
+    handlers = DI.get_all(EventHandler)
+    assert [type(handler) for handler in handlers] == [EmailHandler, AuditHandler]
+
+    dispatcher = DI.get(Dispatcher)
+    assert [type(handler) for handler in dispatcher.handlers] == [
+        EmailHandler,
+        AuditHandler,
+    ]
+    assert DI.get(Auditor).handlers[1] is handlers[1]
+
+
+@pytest.mark.anyio
+async def test_resolving_container_resolves_async_collections_together():
+    started = 0
+    both_started = anyio.Event()
+
+    def create(type_):
+        async def factory():
+            nonlocal started
+            started += 1
+            if started == 2:
+                both_started.set()
+            with anyio.fail_after(1):
+                await both_started.wait()
+            return type_()
+
+        return factory
+
+    DI = ResolvingContainer()
+    DI.register_factory(EmailHandler, create(EmailHandler))
+    DI.register_factory(AuditHandler, create(AuditHandler))
+
+    dispatcher = await DI.aget(Dispatcher)
+    assert [type(handler) for handler in dispatcher.handlers] == [
+        EmailHandler,
+        AuditHandler,
+    ]
+
+
+def test_fastapi_collection_dependencies():
+    DI = FastAPIContainer()
+    DI.register_factory(EmailHandler)
+    DI.register_factory(AuditHandler)
+
+    app = FastAPI()
+
+    @app.get("/")
+    async def test(handlers: DI[list[EventHandler]]) -> list[str]:
+        return [handler.handle("signup") for handler in handlers]
+
+    assert TestClient(app).get("/").json() == [
+        "EmailHandler: signup",
+        "AuditHandler: signup",
+    ]
+
+
+@pytest.mark.anyio
+async def test_collections_fall_back_to_their_default():
+    class Notifier:
+        def __init__(
+            self,
+            handlers: list[EventHandler] = [],
+            tags: list[str] = ["signup"],
+        ):
+            self.handlers = handlers
+            self.tags = tags
+
+    DI = ResolvingContainer()
+    DI.register_instance("unrelated")
+
+    notifier = DI.get(Notifier)
+    assert notifier.tags == ["signup"]
+    assert notifier.handlers == []
+    assert (await DI.aget(Notifier)).tags == ["signup"]
+
+    DI.register_factory(EmailHandler)
+    notifier = await DI.aget(Notifier)
+    assert [type(handler) for handler in notifier.handlers] == [EmailHandler]
+    assert notifier.tags == ["signup"]
+
+
+def test_collections_dont_include_autowired_classes():
+    class NeedsAudit:
+        def __init__(self, handler: AuditHandler):
+            self.handler = handler
+
+    DI = ResolvingContainer()
+    DI.register_factory(EmailHandler)
+    DI.register_factory(Connection, name="primary")
+
+    assert [type(handler) for handler in DI.get_all(EventHandler)] == [EmailHandler]
+
+    DI.get(NeedsAudit)
+    DI.get(Connection)
+    assert [type(handler) for handler in DI.get_all(EventHandler)] == [EmailHandler]
+    assert DI.container.lookup_all(Closeable) == [(Connection, "primary")]
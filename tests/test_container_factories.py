@@ -1,7 +1,7 @@
 import pytest
 
 from dipin import Container
-from dipin.container import PartialFactoryContainerItem
+from dipin.container import ItemKind, PartialFactoryContainerItem
 
 
 class A: ...
@@ -59,3 +59,13 @@ def test_registering_two_factories_of_same_type_replaces_instance_and_emits_warn
     factory_fn = container[(B, None)].factory
     assert callable(factory_fn)
     assert factory_fn().val == 2
+
+
+def test_factory_items_are_slotted():
+    container = Container()
+    container.register_factory(A)
+
+    item = container.get((A, None))
+    assert item.kind is ItemKind.FACTORY
+    assert item.plan is None
+    assert not hasattr(item, "__dict__")
@@ -78,3 +78,45 @@ def test_registering_two_instances_of_same_type_replaces_instance_and_emits_warn
 
     item = container[(A, None)]
     assert item.instance is instance_b
+
+
+def test_register_named_instances():
+    container = Container()
+
+    instance_a = A()
+    instance_b = A()
+
+    container.register_instance(instance_a, name="first")
+    container.register_instance(instance_b, name="second")
+
+    assert len(container) == 2
+    assert container.lookup("first") == (A, "first")
+    assert container.lookup("second") == (A, "second")
+    assert container[container.lookup("second")].instance is instance_b
+
+    with pytest.raises(KeyError):
+        container.lookup("third")
+
+
+def test_registering_existing_name_for_another_type_raises():
+    container = Container()
+
+    container.register_instance(A(), name="service")
+
+    with pytest.raises(KeyError):
+        container.register_instance(B(), name="service")
+
+    assert container.lookup("service") == (A, "service")
+
+
+def test_registering_existing_name_for_same_type_replaces_instance():
+    container = Container()
+
+    instance_a = A()
+    container.register_instance(A(), name="service")
+
+    with pytest.warns(UserWarning):
+        container.register_instance(instance_a, name="service")
+
+    assert len(container) == 1
+    assert container[container.lookup("service")].instance is instance_a
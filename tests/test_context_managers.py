@@ -0,0 +1,132 @@
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from dipin.container import Container
+from dipin.interface import FastAPIContainer, ResolvingContainer
+from dipin.resolver import Resolver
+from dipin.scope import Scope
+
+
+class Connection:
+    def __init__(self):
+        self.released = False
+
+
+class Pool:
+    """An async context manager, checking out a connection when entered"""
+
+    def __init__(self):
+        self.events = []
+
+    async def __aenter__(self) -> Connection:
+        self.events.append("acquire")
+        self.connection = Connection()
+        return self.connection
+
+    async def __aexit__(self, *exc_info):
+        self.events.append("release")
+        self.connection.released = True
+
+
+class Transaction:
+    def __init__(self, connection: Connection):
+        self.connection = connection
+        self.events = []
+
+    def __enter__(self) -> "Transaction":
+        self.events.append("begin")
+        return self
+
+    def __exit__(self, *exc_info):
+        self.events.append("commit")
+
+
+@pytest.mark.anyio
+async def test_scope_enters_context_manager_factories_and_exits_them_in_reverse():
+    pool = Pool()
+    container = Container()
+    container.register_factory(Connection, lambda: pool)
+    container.register_factory(Transaction)
+
+    resolver = Resolver(container)
+
+    async with Scope() as scope:
+        transaction = await resolver.aget((Transaction, None), scope)
+        assert transaction.connection is pool.connection
+        assert pool.events == ["acquire"]
+        assert transaction.events == ["begin"]
+
+    assert pool.events == ["acquire", "release"]
+    assert transaction.events == ["begin", "commit"]
+
+
+@pytest.mark.anyio
+async def test_async_factories_returning_context_managers_are_entered():
+    pool = Pool()
+
+    async def create_connection() -> Pool:
+        return pool
+
+    container = Container()
+    container.register_factory(Connection, create_connection)
+
+    async with Scope() as scope:
+        connection = await Resolver(container).aget((Connection, None), scope)
+        assert connection is pool.connection
+
+    assert connection.released
+
+
+@pytest.mark.anyio
+async def test_cached_context_managers_are_exited_when_the_container_closes():
+    pool = Pool()
+    DI = ResolvingContainer()
+    DI.register_factory(Connection, lambda: pool, create_once=True)
+
+    connection = await DI.aget(Connection)
+    assert DI.get(Connection) is connection
+    assert not connection.released
+
+    await DI.aclose()
+    assert connection.released
+
+
+@pytest.mark.anyio
+async def test_context_managers_are_not_entered_without_a_scope():
+    pool = Pool()
+    Lock = type(threading.Lock())
+
+    DI = ResolvingContainer()
+    DI.register_factory(Connection, lambda: pool)
+    DI.register_factory(Lock, threading.Lock)
+
+    # Nothing would exit them, so they're injected as they are
+    assert await DI.aget(Connection) is pool
+    assert pool.events == []
+    assert not DI.get(Lock).locked()
+    assert not (await DI.aget(Lock)).locked()
+
+
+@pytest.mark.parametrize("native", [False, True])
+def test_fastapi_exits_context_managers_after_the_request(native: bool):
+    pools = []
+
+    def create_connection() -> Pool:
+        pools.append(Pool())
+        return pools[-1]
+
+    DI = FastAPIContainer(native=native)
+    DI.register_factory(Connection, create_connection)
+
+    app = FastAPI()
+
+    @app.get("/")
+    async def test(connection: DI[Connection]) -> bool:
+        return connection.released
+
+    test_client = TestClient(app)
+    assert test_client.get("/").json() is False
+    assert pools[0].events == ["acquire", "release"]
@@ -0,0 +1,120 @@
+import os
+import threading
+import time
+
+import anyio
+import pytest
+
+from dipin.container import Container, Execution
+from dipin.interface import ResolvingContainer
+from dipin.resolver import Resolver
+from dipin.scope import Scope
+
+
+class Config:
+    def __init__(self):
+        self.thread = threading.get_ident()
+
+
+class Cache: ...
+
+
+class Service:
+    def __init__(self, config: Config, cache: Cache):
+        self.config = config
+        self.cache = cache
+
+
+@pytest.mark.anyio
+async def test_thread_factories_run_in_a_worker_thread():
+    DI = ResolvingContainer()
+    DI.register_factory(Config, execution=Execution.THREAD)
+
+    config = await DI.aget(Config)
+    assert config.thread != threading.get_ident()
+
+    # Sync resolution is already blocking, so calls the factory inline
+    assert DI.get(Config).thread == threading.get_ident()
+
+
+@pytest.mark.anyio
+async def test_thread_generator_factories_are_torn_down_with_the_scope():
+    events = []
+
+    def create_config():
+        events.append(threading.get_ident())
+        yield Config()
+        events.append("close")
+
+    container = Container()
+    container.register_factory(Config, create_config, execution=Execution.THREAD)
+
+    async with Scope() as scope:
+        await Resolver(container).aget((Config, None), scope)
+        assert events[0] != threading.get_ident()
+
+    assert events[1:] == ["close"]
+
+
+@pytest.mark.anyio
+async def test_worker_threads_are_bounded_by_the_limiter():
+    running = 0
+    most = 0
+
+    def create(type_):
+        def factory():
+            nonlocal running, most
+            running += 1
+            most = max(most, running)
+            time.sleep(0.01)
+            running -= 1
+            return type_()
+
+        return factory
+
+    container = Container()
+    container.register_factory(Config, create(Config), execution=Execution.THREAD)
+    container.register_factory(Cache, create(Cache), execution=Execution.THREAD)
+    container.register_factory(Service)
+
+    resolver = Resolver(container, concurrent=True, limiter=anyio.CapacityLimiter(1))
+    await resolver.aget((Service, None))
+
+    assert most == 1
+
+
+@pytest.mark.anyio
+async def test_process_factories_run_in_a_worker_process():
+    DI = ResolvingContainer()
+    DI.register_factory(int, os.getpid, execution=Execution.PROCESS)
+
+    assert await DI.aget(int) != os.getpid()
+
+
+def test_async_factories_cannot_be_offloaded():
+    async def create_config() -> Config:
+        return Config()
+
+    DI = ResolvingContainer()
+
+    with pytest.raises(ValueError):
+        DI.register_factory(Config, create_config, execution=Execution.THREAD)
+
+
+@pytest.mark.anyio
+async def test_concurrent_resolution_resolves_sync_leaves_without_tasks(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    container = Container()
+    container.register_factory(Config)
+    container.register_factory(Cache)
+    container.register_factory(Service)
+
+    def fail():
+        raise AssertionError("Sync leaves should be resolved inline")
+
+    monkeypatch.setattr("dipin.resolver.anyio.create_task_group", fail)
+
+    resolver = Resolver(container, concurrent=True)
+    service = await resolver.aget((Service, None))
+    assert isinstance(service.config, Config)
@@ -1,8 +1,12 @@
+import inspect
+import threading
 from typing import Annotated, get_origin, get_args
+import pytest
 from fastapi import FastAPI, Depends, params
 from fastapi.testclient import TestClient
 
 from dipin.interface import FastAPIContainer
+from dipin.resolver import CircularDependencyError
 
 
 def test_fastapi_depends_accessor():
@@ -21,6 +25,7 @@ def test_fastapi_depends_accessor():
     assert real_type is Service
     assert isinstance(depends, params.Depends)
     assert depends.use_cache is False
+    assert inspect.iscoroutinefunction(depends.dependency)
 
     result = dependency()
     assert isinstance(result, Service)
@@ -294,3 +299,195 @@ def test_fastapi_autowiring():
 
     assert json["svc_type"] == "DependentService"
     assert json["svc_service_type"] == "Service"
+
+
+def test_fastapi_async_dependencies_resolve_on_event_loop():
+    DI = FastAPIContainer()
+
+    class Service:
+        thread_id: int
+
+    async def create_service():
+        svc = Service()
+        svc.thread_id = threading.get_ident()
+        yield svc
+
+    DI.register_factory(Service, create_service)
+
+    app = FastAPI()
+
+    @app.get("/")
+    async def test(svc: DI[Service]):
+        return {"factory": svc.thread_id, "handler": threading.get_ident()}
+
+    test_client = TestClient(app)
+    json = test_client.get("/").json()
+
+    assert json["factory"] == json["handler"]
+
+
+def test_fastapi_request_scope_tears_down_generator_factories():
+    DI = FastAPIContainer()
+    events = []
+
+    class Connection: ...
+
+    class Repository:
+        def __init__(self, connection: Connection):
+            self.connection = connection
+
+    async def create_connection():
+        events.append("open")
+        yield Connection()
+        events.append("close")
+
+    DI.register_factory(Connection, create_connection)
+    DI.register_factory(Repository)
+
+    app = FastAPI()
+
+    @app.get("/")
+    async def test(repo: DI[Repository], connection: DI[Connection]):
+        return {"shared": repo.connection is connection}
+
+    test_client = TestClient(app)
+    for i in range(1, 3):
+        json = test_client.get("/").json()
+
+        assert json["shared"] is True
+        assert events == ["open", "close"] * i
+
+
+def test_fastapi_dependencies_are_built_once_per_key():
+    DI = FastAPIContainer()
+
+    class Service: ...
+
+    DI.register_factory(Service)
+
+    assert DI[Service] is DI[Service]
+
+
+def test_fastapi_frozen_singletons_are_injected_without_resolving():
+    DI = FastAPIContainer()
+
+    class Service: ...
+
+    DI.register_factory(Service, create_once=True)
+    DI.warmup()
+    DI.freeze()
+
+    _, depends = get_args(DI[Service])
+    assert inspect.iscoroutinefunction(depends.dependency)
+    assert inspect.signature(depends.dependency).parameters == {}
+
+    app = FastAPI()
+
+    @app.get("/")
+    async def test(svc: DI[Service]) -> int:
+        return id(svc)
+
+    assert TestClient(app).get("/").json() == id(DI.get(Service))
+
+
+def test_fastapi_native_dependencies_are_solved_by_fastapi():
+    DI = FastAPIContainer(native=True)
+    events = []
+
+    class Connection: ...
+
+    class Repository:
+        def __init__(self, connection: Connection, limit: int = 10):
+            self.connection = connection
+            self.limit = limit
+
+    def create_connection():
+        events.append("open")
+        yield Connection()
+        events.append("close")
+
+    DI.register_factory(Connection, create_connection)
+    DI.register_factory(Repository)
+
+    def get_page(repository: DI[Repository]) -> int:
+        return repository.limit
+
+    app = FastAPI()
+
+    @app.get("/")
+    async def test(
+        connection: DI[Connection],
+        repository: DI[Repository],
+        page: Annotated[int, Depends(get_page)],
+    ) -> bool:
+        assert page == 10
+        return repository.connection is connection
+
+    assert TestClient(app).get("/").json() is True
+    assert events == ["open", "close"]
+
+
+def test_fastapi_native_dependencies_resolve_cached_items_once():
+    DI = FastAPIContainer(native=True)
+
+    class Engine: ...
+
+    class Session:
+        def __init__(self, engine: Engine):
+            self.engine = engine
+
+    DI.register_factory(Engine, create_once=True)
+    DI.register_factory(Session)
+
+    app = FastAPI()
+
+    @app.get("/")
+    async def test(session: DI[Session]) -> int:
+        return id(session.engine)
+
+    test_client = TestClient(app)
+    assert test_client.get("/").json() == test_client.get("/").json()
+    assert test_client.get("/").json() == id(DI.get(Engine))
+
+
+def test_fastapi_native_dependencies_reject_cycles():
+    DI = FastAPIContainer(native=True)
+
+    class A:
+        def __init__(self, b: "B"): ...
+
+    class B:
+        def __init__(self, a: A): ...
+
+    A.__init__.__annotations__["b"] = B
+    DI.register_factory(A)
+    DI.register_factory(B)
+
+    with pytest.raises(CircularDependencyError):
+        DI[A]
+
+
+def test_fastapi_dependencies_declared_before_freezing_inject_singletons(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    DI = FastAPIContainer()
+
+    class Service: ...
+
+    DI.register_factory(Service, create_once=True)
+
+    app = FastAPI()
+
+    @app.get("/")
+    async def test(svc: DI[Service]) -> int:
+        return id(svc)
+
+    DI.warmup()
+    DI.freeze()
+
+    async def fail(*args):
+        raise AssertionError("Frozen singletons should be injected without resolving")
+
+    monkeypatch.setattr(DI.resolver, "aget", fail)
+
+    assert TestClient(app).get("/").json() == id(DI.get(Service))
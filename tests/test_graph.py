@@ -0,0 +1,138 @@
+import pytest
+
+from dipin.container import Container, describe_key
+from dipin.graph import DependencyGraph
+from dipin.resolver import CircularDependencyError, Resolver, UnfillableArgumentError
+
+
+class A: ...
+
+
+class B:
+    def __init__(self, a: A):
+        self.a = a
+
+
+class C:
+    def __init__(self, a: A, b: B):
+        self.a = a
+        self.b = b
+
+
+class X: ...
+
+
+class Y: ...
+
+
+class Z: ...
+
+
+def create_x(y: Y) -> X: ...
+
+
+def create_y(z: Z) -> Y: ...
+
+
+def create_z(x: X) -> Z: ...
+
+
+def test_graph_topological_order():
+    graph = DependencyGraph()
+    graph.add((C, None), [(A, None), (B, None)])
+    graph.add((B, None), [(A, None)])
+    graph.add((A, None), [])
+
+    order = graph.topological_order()
+    assert order == [(A, None), (B, None), (C, None)]
+    assert graph.find_cycle() is None
+    assert graph.depths() == {(A, None): 0, (B, None): 1, (C, None): 2}
+
+
+def test_graph_finds_cycle_path():
+    graph = DependencyGraph()
+    graph.add((A, None), [(X, None)])
+    graph.add((X, None), [(Y, None)])
+    graph.add((Y, None), [(Z, None)])
+    graph.add((Z, None), [(X, None)])
+
+    assert graph.find_cycle() == [(X, None), (Y, None), (Z, None), (X, None)]
+
+
+def test_graph_handles_deep_dependency_chains():
+    types = [type(f"T{i}", (), {}) for i in range(5000)]
+
+    graph = DependencyGraph()
+    for dependent, dependency in zip(types, types[1:]):
+        graph.add((dependent, None), [(dependency, None)])
+
+    order = graph.topological_order()
+    assert order[0] == (types[-1], None)
+    assert order[-1] == (types[0], None)
+
+
+def test_resolver_builds_graph_with_autowired_dependencies():
+    container = Container()
+    container.register_factory(C)
+
+    resolver = Resolver(container)
+    graph = resolver.build_graph()
+
+    assert graph.dependencies == {
+        (C, None): [(A, None), (B, None)],
+        (B, None): [(A, None)],
+        (A, None): [],
+    }
+    assert (A, None) in container
+    assert (B, None) in container
+
+
+def test_validate_names_the_cycle():
+    container = Container()
+    container.register_factory(A)
+    container.register_factory(X, create_x)
+    container.register_factory(Y, create_y)
+    container.register_factory(Z, create_z)
+
+    resolver = Resolver(container)
+
+    with pytest.raises(CircularDependencyError) as e:
+        resolver.validate()
+
+    assert e.value.path[0] == e.value.path[-1]
+    assert set(e.value.path) == {(X, None), (Y, None), (Z, None)}
+    assert " -> ".join(describe_key(key) for key in e.value.path) in str(e.value)
+
+
+def test_validate_reports_unfillable_parameters():
+    class Client:
+        def __init__(self, token: str): ...
+
+    container = Container()
+    container.register_factory(Client)
+
+    resolver = Resolver(container)
+
+    with pytest.raises(UnfillableArgumentError) as e:
+        resolver.validate()
+
+    assert e.value.dependency == (Client, None)
+    assert str(e.value).startswith("Unable to fill parameter token (<class 'str'>) for")
+
+
+@pytest.mark.anyio
+async def test_validated_resolver_skips_cycle_tracking(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    container = Container()
+    container.register_factory(C)
+
+    resolver = Resolver(container, concurrent=True)
+    resolver.validate()
+    assert resolver.active_keys() is None
+
+    c = await resolver.aget((C, None))
+    assert isinstance(c.b.a, A)
+
+    container.register_factory(X, create_x)
+    assert resolver.active_keys() == {}
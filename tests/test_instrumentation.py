@@ -0,0 +1,157 @@
+import pytest
+
+from dipin.container import Container
+from dipin.instrumentation import Histogram, ResolutionHook, ResolutionStats
+from dipin.interface import ResolvingContainer
+from dipin.resolver import Resolver
+from dipin.scope import Scope
+
+
+class Config: ...
+
+
+class Client:
+    def __init__(self, config: Config):
+        self.config = config
+
+
+class Service:
+    def __init__(self, client: Client, config: Config):
+        self.client = client
+        self.config = config
+
+
+class RecordingHook(ResolutionHook):
+    def __init__(self):
+        self.events = []
+
+    def on_resolve_start(self, key, depth):
+        self.events.append(("start", key[0], depth))
+
+    def on_resolve_end(self, key, depth, duration):
+        self.events.append(("end", key[0], depth))
+
+    def on_cache_hit(self, key, depth):
+        self.events.append(("hit", key[0], depth))
+
+    def on_cache_miss(self, key, depth):
+        self.events.append(("miss", key[0], depth))
+
+    def on_factory(self, key, depth, duration):
+        self.events.append(("factory", key[0], depth))
+
+    def on_teardown(self, key, depth, duration):
+        self.events.append(("teardown", key[0], depth))
+
+
+def create_resolver() -> Resolver:
+    container = Container()
+    container.register_factory(Config, create_once=True)
+    container.register_factory(Client)
+    container.register_factory(Service)
+    return Resolver(container)
+
+
+def test_resolver_emits_events_with_depths():
+    resolver = create_resolver()
+    hook = RecordingHook()
+    resolver.add_hook(hook)
+
+    resolver.get((Service, None))
+
+    assert hook.events == [
+        ("start", Service, 0),
+        ("start", Client, 1),
+        ("start", Config, 2),
+        ("miss", Config, 2),
+        ("factory", Config, 2),
+        ("end", Config, 2),
+        ("factory", Client, 1),
+        ("end", Client, 1),
+        ("start", Config, 1),
+        ("hit", Config, 1),
+        ("end", Config, 1),
+        ("factory", Service, 0),
+        ("end", Service, 0),
+    ]
+
+
+@pytest.mark.anyio
+async def test_async_resolver_emits_events_with_depths():
+    resolver = create_resolver()
+    hook = RecordingHook()
+    resolver.add_hook(hook)
+
+    await resolver.aget((Service, None))
+
+    assert hook.events[:3] == [
+        ("start", Service, 0),
+        ("start", Client, 1),
+        ("start", Config, 2),
+    ]
+    assert ("hit", Config, 1) in hook.events
+    assert hook.events[-1] == ("end", Service, 0)
+
+
+def test_removing_the_last_hook_disables_instrumentation():
+    resolver = create_resolver()
+    hook = RecordingHook()
+    resolver.add_hook(hook)
+    resolver.remove_hook(hook)
+
+    resolver.get((Service, None))
+
+    assert resolver.instrumentation is None
+    assert hook.events == []
+
+
+def test_resolution_stats_counts_per_key():
+    container = ResolvingContainer()
+    container.register_factory(Config, create_once=True)
+    container.register_factory(Client)
+    stats = ResolutionStats()
+    container.add_hook(stats)
+
+    container.get(Client)
+    container.get(Client)
+
+    assert stats[(Client, None)].resolutions == 2
+    assert stats[(Client, None)].factory_time.count == 2
+    assert stats[(Config, None)].cache_misses == 1
+    assert stats[(Config, None)].cache_hits == 1
+    assert stats[(Config, None)].factory_time.count == 1
+
+    stats.reset()
+    assert stats.stats == {}
+
+
+def test_histogram_buckets_values_by_upper_bound():
+    histogram = Histogram((0.1, 1.0))
+
+    histogram.record(0.05)
+    histogram.record(0.1)
+    histogram.record(0.5)
+    histogram.record(5.0)
+
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.count == 4
+    assert histogram.mean == pytest.approx(1.4125)
+
+
+@pytest.mark.anyio
+async def test_scope_reports_teardown_time():
+    def create_client(config: Config):
+        yield Client(config)
+
+    container = Container()
+    container.register_factory(Config)
+    container.register_factory(Client, create_client)
+    resolver = Resolver(container)
+    hook = RecordingHook()
+    resolver.add_hook(hook)
+
+    async with Scope() as scope:
+        await resolver.aget((Client, None), scope)
+        assert ("teardown", Client, 0) not in hook.events
+
+    assert hook.events[-1] == ("teardown", Client, 0)
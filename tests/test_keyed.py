@@ -0,0 +1,135 @@
+import pytest
+
+from dipin.cache import LRU
+from dipin.interface import ResolvingContainer
+from dipin.resolver import MissingKeyError
+
+
+class Settings:
+    dsn = "postgres://db"
+
+
+class Engine:
+    def __init__(self, dsn: str, tenant: str):
+        self.dsn = dsn
+        self.tenant = tenant
+        self.disposed = False
+
+
+def create_engine(key: str, settings: Settings):
+    engine = Engine(settings.dsn, key)
+    yield engine
+    engine.disposed = True
+
+
+def test_keyed_factories_are_passed_their_key_and_cached_per_key():
+    DI = ResolvingContainer()
+    DI.register_factory(Engine, create_engine, keyed=True)
+
+    a = DI.get(Engine, key="tenant-a")
+    b = DI.get(Engine, key="tenant-b")
+
+    assert a.tenant == "tenant-a"
+    assert b.tenant == "tenant-b"
+    assert a.dsn == "postgres://db"
+    assert DI.get(Engine, key="tenant-a") is a
+
+
+def test_keyed_factories_evict_and_tear_down_least_recently_used_keys():
+    policy = LRU(maxsize=2)
+    DI = ResolvingContainer()
+    DI.register_factory(Engine, create_engine, keyed=True, cache=policy)
+
+    a = DI.get(Engine, key="a")
+    b = DI.get(Engine, key="b")
+    DI.get(Engine, key="a")
+    DI.get(Engine, key="c")
+
+    assert len(policy) == 2
+    assert b.disposed
+    assert not a.disposed
+    assert DI.get(Engine, key="a") is a
+
+
+@pytest.mark.anyio
+async def test_keyed_factories_close_evicted_instances():
+    class Client:
+        def __init__(self, key: str):
+            self.closed = False
+
+        def close(self):
+            self.closed = True
+
+    class AsyncClient(Client):
+        async def aclose(self):
+            self.closed = True
+
+    DI = ResolvingContainer()
+    DI.register_factory(Client, keyed=True, cache=LRU(maxsize=1))
+    DI.register_factory(AsyncClient, keyed=True, cache=LRU(maxsize=1))
+
+    a = DI.get(Client, key="a")
+    DI.get(Client, key="b")
+    assert a.closed
+
+    a = await DI.aget(AsyncClient, key="a")
+    await DI.aget(AsyncClient, key="b")
+    assert a.closed
+
+
+def test_keyed_factories_need_a_key():
+    DI = ResolvingContainer()
+    DI.register_factory(Engine, create_engine, keyed=True)
+
+    with pytest.raises(MissingKeyError):
+        DI.get(Engine)
+
+
+def test_keyed_factories_cannot_be_create_once():
+    DI = ResolvingContainer()
+
+    with pytest.raises(ValueError):
+        DI.register_factory(Engine, create_engine, keyed=True, create_once=True)
+
+
+def test_overridden_dependencies_of_keyed_factories_are_not_cached():
+    DI = ResolvingContainer()
+    DI.register_factory(Engine, create_engine, keyed=True)
+    cached = DI.get(Engine, key="a")
+
+    class TestSettings(Settings):
+        dsn = "sqlite://"
+
+    with DI.override(Settings, TestSettings()):
+        overridden = DI.get(Engine, key="a")
+        assert overridden.dsn == "sqlite://"
+        assert DI.get(Engine, key="a") is not overridden
+
+    assert DI.get(Engine, key="a") is cached
+
+
+@pytest.mark.anyio
+async def test_async_keyed_factories_build_each_key_once():
+    built = []
+
+    async def create_engine(key: str, settings: Settings) -> Engine:
+        built.append(key)
+        return Engine(settings.dsn, key)
+
+    DI = ResolvingContainer()
+    DI.register_factory(Engine, create_engine, keyed=True)
+
+    a = await DI.aget(Engine, key="a")
+    assert await DI.aget(Engine, key="a") is a
+    assert (await DI.aget(Engine, key="b")).tenant == "b"
+    assert built == ["a", "b"]
+
+
+def test_keyed_factories_dont_keep_a_lock_per_key():
+    DI = ResolvingContainer()
+    DI.register_factory(Engine, create_engine, keyed=True, cache=LRU(10))
+
+    for tenant in range(100):
+        DI.get(Engine, key=f"tenant-{tenant}")
+
+    assert DI.resolver.locks == {}
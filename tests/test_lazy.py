@@ -0,0 +1,100 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from dipin import Lazy
+from dipin.interface import FastAPIContainer, ResolvingContainer
+from dipin.scope import Scope
+
+
+class S3Client:
+    created = 0
+
+    def __init__(self):
+        S3Client.created += 1
+
+
+class Reports:
+    def __init__(self, s3: Lazy[S3Client]):
+        self.s3 = s3
+
+
+@pytest.fixture(autouse=True)
+def reset_created():
+    S3Client.created = 0
+
+
+def test_lazy_dependencies_are_resolved_once_used():
+    DI = ResolvingContainer()
+    DI.register_factory(Reports)
+
+    reports = DI.get(Reports)
+    assert S3Client.created == 0
+    assert not reports.s3.resolved
+
+    s3 = reports.s3.get()
+    assert isinstance(s3, S3Client)
+    assert reports.s3.get() is s3
+    assert S3Client.created == 1
+
+
+@pytest.mark.anyio
+async def test_lazy_dependencies_are_resolved_async_in_the_scope():
+    events = []
+
+    def create_s3():
+        yield S3Client()
+        events.append("closed")
+
+    DI = ResolvingContainer()
+    DI.register_factory(S3Client, create_s3)
+    DI.register_factory(Reports)
+
+    async with Scope() as scope:
+        reports = await DI.aget(Reports, scope)
+        assert S3Client.created == 0
+
+        assert await reports.s3.aget() is await reports.s3.aget()
+        assert events == []
+
+    assert events == ["closed"]
+
+
+def test_lazy_dependencies_are_not_validated_as_cycles():
+    class Parent:
+        def __init__(self, child: "Lazy[Child]"):
+            self.child = child
+
+    class Child:
+        def __init__(self, parent: Parent):
+            self.parent = parent
+
+    Parent.__init__.__annotations__["child"] = Lazy[Child]
+
+    DI = ResolvingContainer()
+    DI.register_factory(Parent, create_once=True)
+    DI.register_factory(Child)
+    DI.validate()
+
+    parent = DI.get(Parent)
+    assert parent.child.get().parent is parent
+
+
+@pytest.mark.parametrize("native", [False, True])
+def test_fastapi_lazy_dependencies(native: bool):
+    DI = FastAPIContainer(native=native)
+    DI.register_factory(Reports)
+
+    app = FastAPI()
+
+    @app.get("/")
+    async def test(reports: DI[Reports], s3: DI[Lazy[S3Client]], use: bool) -> int:
+        assert isinstance(s3, Lazy)
+        if use:
+            # Both handles resolve in the request's scope
+            assert await s3.aget() is await reports.s3.aget()
+        return S3Client.created
+
+    test_client = TestClient(app)
+    assert test_client.get("/", params={"use": False}).json() == 0
+    assert test_client.get("/", params={"use": True}).json() == 1
@@ -0,0 +1,200 @@
+import warnings
+
+import anyio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from dipin.interface import FastAPIContainer, ResolvingContainer
+from dipin.lazy import Lazy
+
+
+class Settings:
+    def __init__(self, debug: bool = False):
+        self.debug = debug
+
+
+class Engine:
+    def __init__(self, settings: Settings):
+        self.settings = settings
+
+
+class Mailer: ...
+
+
+class Service:
+    def __init__(self, engine: Engine, mailer: Mailer):
+        self.engine = engine
+        self.mailer = mailer
+
+
+def create_container() -> ResolvingContainer:
+    DI = ResolvingContainer()
+    DI.register_instance(Settings())
+    DI.register_factory(Engine, create_once=True)
+    DI.register_factory(Mailer, create_once=True)
+    DI.register_factory(Service)
+    return DI
+
+
+def test_override_substitutes_an_instance_in_the_context():
+    DI = create_container()
+    debug = Settings(debug=True)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        with DI.override(Settings, debug):
+            assert DI.get(Settings) is debug
+
+    assert DI.get(Settings) is not debug
+
+
+def test_override_bypasses_caches_of_dependents():
+    DI = create_container()
+    engine = DI.get(Engine)
+    mailer = DI.get(Mailer)
+
+    with DI.override(Settings, Settings(debug=True)):
+        service = DI.get(Service)
+        assert service.engine.settings.debug
+        assert service.engine is not engine
+        # Unaffected items are still cached
+        assert service.mailer is mailer
+
+    assert DI.get(Engine) is engine
+
+
+def test_override_bypasses_caches_of_dependents_through_autowired_items():
+    class Repository:
+        def __init__(self, engine: Engine):
+            self.engine = engine
+
+    class Reports:
+        def __init__(self, repository: Repository):
+            self.repository = repository
+
+    DI = create_container()
+    DI.register_factory(Reports, create_once=True)
+
+    # Repository is only autowired once resolved
+    with DI.override(Engine, factory=lambda: Engine(Settings(debug=True))):
+        assert DI.get(Reports).repository.engine.settings.debug
+        assert DI.get(Reports) is not DI.get(Reports)
+
+    reports = DI.get(Reports)
+    assert not reports.repository.engine.settings.debug
+    assert DI.get(Reports) is reports
+
+
+def test_override_bypasses_caches_of_lazy_dependents():
+    class Notifier:
+        def __init__(self, mailer: Lazy[Mailer]):
+            self.mailer = mailer
+
+    DI = create_container()
+    DI.register_factory(Notifier, create_once=True)
+
+    with DI.override(Mailer, "fake mailer"):
+        assert DI.get(Notifier).mailer.get() == "fake mailer"
+
+    assert isinstance(DI.get(Notifier).mailer.get(), Mailer)
+
+
+def test_override_with_a_factory_and_as_a_decorator():
+    DI = create_container()
+
+    @DI.override(Mailer, factory=lambda: "fake mailer")
+    def send() -> Mailer:
+        return DI.get(Service).mailer
+
+    assert send() == "fake mailer"
+    assert isinstance(DI.get(Service).mailer, Mailer)
+
+
+def test_overrides_nest():
+    DI = create_container()
+    debug = Settings(debug=True)
+
+    with DI.override(Settings, debug):
+        with DI.override(Mailer, factory=lambda: "fake mailer"):
+            assert DI.get(Settings) is debug
+            assert DI.get(Mailer) == "fake mailer"
+
+        assert DI.get(Settings) is debug
+        assert isinstance(DI.get(Mailer), Mailer)
+
+
+@pytest.mark.anyio
+async def test_overrides_only_apply_to_the_current_task():
+    DI = create_container()
+    debug = Settings(debug=True)
+    results = {}
+
+    @DI.override(Settings, debug)
+    async def overridden():
+        await anyio.sleep(0.01)
+        results["overridden"] = await DI.aget(Settings)
+
+    async def default():
+        await anyio.sleep(0.01)
+        results["default"] = await DI.aget(Settings)
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(overridden)
+        tg.start_soon(default)
+
+    assert results["overridden"] is debug
+    assert results["default"] is not debug
+
+
+def test_override_frozen_singletons_injected_by_fastapi():
+    DI = FastAPIContainer()
+    DI.register_instance(Settings())
+    DI.freeze()
+
+    app = FastAPI()
+
+    @app.get("/")
+    async def test(settings: DI[Settings]) -> bool:
+        return settings.debug
+
+    test_client = TestClient(app)
+    with DI.override(Settings, Settings(debug=True)):
+        assert test_client.get("/").json() is True
+    assert test_client.get("/").json() is False
+
+
+def test_override_native_fastapi_dependencies():
+    created = []
+
+    def create_mailer() -> Mailer:
+        created.append(Mailer)
+        return Mailer()
+
+    DI = FastAPIContainer(native=True)
+    DI.register_instance(Settings())
+    DI.register_factory(Engine)
+    DI.register_factory(Mailer, create_mailer)
+    DI.register_factory(Service)
+
+    app = FastAPI()
+
+    @app.get("/")
+    async def test(service: DI[Service], settings: DI[Settings]) -> list:
+        mailer = service.mailer if isinstance(service.mailer, str) else "mailer"
+        return [mailer, service.engine.settings.debug, settings.debug]
+
+    test_client = TestClient(app)
+    with DI.override(Mailer, "fake mailer"):
+        with DI.override(Settings, Settings(debug=True)):
+            assert test_client.get("/").json() == ["fake mailer", True, True]
+
+    assert created == []
+    assert test_client.get("/").json() == ["mailer", False, False]
+
+
+def test_override_requires_an_instance_or_factory():
+    DI = create_container()
+
+    with pytest.raises(ValueError):
+        DI.override(Settings)
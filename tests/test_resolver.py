@@ -1,7 +1,13 @@
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import anyio
 import pytest
 
 from dipin.container import Container
 from dipin.resolver import Resolver, CircularDependencyError, UnfillableArgumentError
+from dipin.scope import Scope
 
 
 class A:
@@ -40,7 +46,6 @@ def test_resolver_instantiates_dependent():
     assert isinstance(b.a, A)
 
 
-@pytest.mark.xfail
 def test_resolver_circular_dependency():
     container = Container()
     container.register_factory(Circular)
@@ -51,16 +56,34 @@ def test_resolver_circular_dependency():
         resolver.get((Circular, None))
 
 
-def test_resolver_fails_on_string_dependencies():
+def test_resolver_string_dependencies():
+    class C:
+        def __init__(self, b: "B"):
+            self.b = b
+
     container = Container()
-    container.register_factory(Circular)
+    container.register_factory(C)
 
     resolver = Resolver(container)
 
-    with pytest.raises(NotImplementedError) as e:
-        resolver.get((Circular, None))
+    assert isinstance(resolver.get((C, None)).b.a, A)
+
+
+def test_resolver_unresolvable_string_dependencies():
+    class Local: ...
+
+    class C:
+        def __init__(self, local: "Local"): ...
 
-    assert str(e.value) == "String annotations are not supported yet"
+    container = Container()
+    container.register_factory(C)
+
+    resolver = Resolver(container)
+
+    with pytest.raises(UnfillableArgumentError) as e:
+        resolver.get((C, None))
+
+    assert e.value.arg_type == "Local"
 
 
 @pytest.mark.parametrize("use_autowiring", [True, False])
@@ -94,3 +117,210 @@ def test_resolver_with_non_type_default_arg():
 
     assert isinstance(a, A)
     assert a.val == 1
+
+
+def test_resolver_compiles_plans_once(monkeypatch: pytest.MonkeyPatch):
+    container = Container()
+    container.register_factory(A)
+    container.register_factory(B)
+
+    resolver = Resolver(container)
+    resolver.get((B, None))
+
+    plan = container.get((B, None)).plan
+    assert [p.name for p in plan.parameters] == ["a"]
+    assert plan.parameters[0].dependency == (A, None)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Factory signatures should not be inspected again")
+
+    monkeypatch.setattr("dipin.resolver.inspect.signature", fail)
+
+    b = resolver.get((B, None))
+    assert isinstance(b, B)
+    assert container.get((B, None)).plan is plan
+
+
+def test_resolver_recompiles_plans_of_replaced_items():
+    container = Container()
+    container.register_factory(B, lambda: B(A()))
+
+    resolver = Resolver(container)
+    resolver.get((B, None))
+    assert container.get((B, None)).plan.parameters == []
+
+    with pytest.warns(UserWarning):
+        container.register_factory(B)
+    container.register_factory(A)
+
+    b = resolver.get((B, None))
+    assert isinstance(b.a, A)
+    assert [p.name for p in container.get((B, None)).plan.parameters] == ["a"]
+
+
+@pytest.mark.anyio
+async def test_resolver_awaits_async_factories():
+    container = Container()
+
+    async def create_a() -> A:
+        return A()
+
+    async def create_b(a: A):
+        yield B(a)
+
+    container.register_factory(A, create_a)
+    container.register_factory(B, create_b)
+
+    resolver = Resolver(container)
+
+    b = await resolver.aget((B, None))
+    assert isinstance(b, B)
+    assert isinstance(b.a, A)
+
+
+@pytest.mark.anyio
+async def test_resolver_concurrently_resolves_sibling_dependencies():
+    class Session: ...
+
+    class Redis: ...
+
+    class HTTPClient: ...
+
+    class Service:
+        def __init__(self, session: Session, redis: Redis, http: HTTPClient):
+            self.session = session
+            self.redis = redis
+            self.http = http
+
+    class Settings: ...
+
+    settings_created = 0
+
+    def create_settings() -> Settings:
+        nonlocal settings_created
+        settings_created += 1
+        return Settings()
+
+    def slow_factory(type_):
+        async def create(settings: Settings):
+            await anyio.sleep(0.1)
+            return type_()
+
+        return create
+
+    container = Container()
+    container.register_factory(Settings, create_settings)
+    for type_ in (Session, Redis, HTTPClient):
+        container.register_factory(type_, slow_factory(type_))
+
+    resolver = Resolver(container, concurrent=True)
+
+    started = time.perf_counter()
+    svc = await resolver.aget((Service, None))
+    elapsed = time.perf_counter() - started
+
+    assert isinstance(svc.session, Session)
+    assert isinstance(svc.redis, Redis)
+    assert isinstance(svc.http, HTTPClient)
+    assert elapsed < 0.25
+    assert settings_created == 1
+
+
+@pytest.mark.anyio
+async def test_resolver_concurrent_circular_dependency():
+    class X: ...
+
+    class Y: ...
+
+    def create_x(y: Y) -> X: ...
+
+    def create_y(x: X) -> Y: ...
+
+    container = Container()
+    container.register_factory(X, create_x)
+    container.register_factory(Y, create_y)
+
+    resolver = Resolver(container, concurrent=True)
+
+    with pytest.raises(CircularDependencyError):
+        await resolver.aget((X, None))
+
+
+def deep_dependency_chain(container: Container, depth: int) -> type:
+    dependency = type("Leaf", (), {})
+    container.register_factory(dependency)
+
+    for i in range(depth):
+
+        def init(self, dep):
+            self.dep = dep
+
+        init.__annotations__ = {"dep": dependency}
+        dependency = type(f"Level{i}", (), {"__init__": init})
+        container.register_factory(dependency)
+
+    return dependency
+
+
+def test_resolver_resolves_dependency_chains_deeper_than_recursion_limit():
+    container = Container()
+    root = deep_dependency_chain(container, sys.getrecursionlimit() * 2)
+
+    resolver = Resolver(container)
+
+    assert isinstance(resolver.get((root, None)), root)
+
+
+@pytest.mark.anyio
+async def test_resolver_async_resolves_dependency_chains_deeper_than_recursion_limit():
+    container = Container()
+    root = deep_dependency_chain(container, sys.getrecursionlimit() * 2)
+
+    resolver = Resolver(container)
+
+    assert isinstance(await resolver.aget((root, None)), root)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("concurrent", [False, True])
+async def test_resolver_scoped_resolves_dependency_chains_deeper_than_recursion_limit(
+    concurrent: bool,
+):
+    container = Container()
+    root = deep_dependency_chain(container, sys.getrecursionlimit() * 2)
+
+    resolver = Resolver(container, concurrent=concurrent)
+
+    async with Scope() as scope:
+        assert isinstance(await resolver.aget((root, None), scope), root)
+
+
+def test_resolver_circular_dependency_names_path():
+    class X: ...
+
+    class Y: ...
+
+    def create_x(y: Y) -> X:
+        return X()
+
+    def create_y(x: X) -> Y: ...
+
+    container = Container()
+    container.register_factory(X, create_x, create_once=True)
+    container.register_factory(Y, create_y)
+
+    resolver = Resolver(container)
+
+    with pytest.raises(CircularDependencyError) as e:
+        resolver.get((X, None))
+
+    assert e.value.path == [(X, None), (Y, None), (X, None)]
+
+    # The cached item's lock was released when resolution failed
+    with pytest.warns(UserWarning):
+        container.register_factory(Y)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        x = executor.submit(resolver.get, (X, None)).result(timeout=1)
+
+    assert isinstance(x, X)
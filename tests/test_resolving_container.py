@@ -1,6 +1,14 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import anyio
+import pytest
+
 from dipin import Container
 from dipin.interface import ResolvingContainer
-from dipin.resolver import Resolver
+from dipin.resolver import CircularDependencyError, Resolver, UnfillableArgumentError
+from dipin.scope import Scope
 
 
 def test_resolving_container_caches_create_once_factories():
@@ -39,3 +47,194 @@ def test_resolving_container_doesnt_cache_other_factories():
 
     res_2 = interface.retrieve((A, None))
     assert res is not res_2
+
+
+@pytest.mark.anyio
+async def test_resolving_container_async_caches_create_once_factories():
+    class A: ...
+
+    async def create_a() -> A:
+        return A()
+
+    interface = ResolvingContainer()
+    interface.register_factory(A, create_a, create_once=True)
+
+    res = await interface.aget(A)
+    assert isinstance(res, A)
+
+    res_2 = await interface.aget(A)
+    assert res is res_2
+
+
+def test_resolving_container_caches_nested_create_once_factories():
+    class A: ...
+
+    class B:
+        def __init__(self, a: A):
+            self.a = a
+
+    interface = ResolvingContainer()
+    interface.register_factory(A, create_once=True)
+    interface.register_factory(B)
+
+    b_1 = interface.get(B)
+    b_2 = interface.get(B)
+    assert b_1 is not b_2
+    assert b_1.a is b_2.a
+
+
+def test_resolving_container_constructs_create_once_factories_once_across_threads():
+    class Engine: ...
+
+    created = 0
+
+    def create_engine() -> Engine:
+        nonlocal created
+        created += 1
+        time.sleep(0.05)
+        return Engine()
+
+    interface = ResolvingContainer()
+    interface.register_factory(Engine, create_engine, create_once=True)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        engines = list(executor.map(lambda _: interface.get(Engine), range(8)))
+
+    assert created == 1
+    assert all(engine is engines[0] for engine in engines)
+
+
+@pytest.mark.anyio
+async def test_resolving_container_constructs_create_once_factories_once_across_tasks():
+    class Engine: ...
+
+    created = 0
+
+    async def create_engine() -> Engine:
+        nonlocal created
+        created += 1
+        await anyio.sleep(0.05)
+        return Engine()
+
+    interface = ResolvingContainer()
+    interface.register_factory(Engine, create_engine, create_once=True)
+
+    engines = []
+
+    async def resolve():
+        engines.append(await interface.aget(Engine))
+
+    async with anyio.create_task_group() as tg:
+        for _ in range(8):
+            tg.start_soon(resolve)
+
+    assert created == 1
+    assert all(engine is engines[0] for engine in engines)
+
+
+@pytest.mark.anyio
+async def test_resolving_container_waiters_take_over_cancelled_construction():
+    class Engine: ...
+
+    created = 0
+    started = anyio.Event()
+
+    async def create_engine() -> Engine:
+        nonlocal created
+        created += 1
+        if created == 1:
+            started.set()
+            await anyio.sleep_forever()
+        return Engine()
+
+    interface = ResolvingContainer()
+    interface.register_factory(Engine, create_engine, create_once=True)
+
+    engines = []
+    cancel_scope = anyio.CancelScope()
+
+    async def build():
+        with cancel_scope:
+            await interface.aget(Engine)
+
+    async def wait():
+        engines.append(await interface.aget(Engine))
+
+    with anyio.fail_after(1):
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(build)
+            await started.wait()
+            tg.start_soon(wait)
+            await anyio.sleep(0.01)
+            cancel_scope.cancel()
+
+    assert created == 2
+    assert engines == [interface.get(Engine)]
+
+
+@pytest.mark.anyio
+async def test_resolving_container_async_create_once_circular_dependency():
+    class X: ...
+
+    class Y: ...
+
+    def create_x(y: Y) -> X: ...
+
+    def create_y(x: X) -> Y: ...
+
+    interface = ResolvingContainer()
+    interface.register_factory(X, create_x, create_once=True)
+    interface.register_factory(Y, create_y)
+
+    with pytest.raises(CircularDependencyError):
+        await interface.aget(X)
+
+
+def test_resolving_container_unfillable_create_once_factories_fail_across_threads():
+    class Engine:
+        def __init__(self, dsn: str): ...
+
+    interface = ResolvingContainer()
+    interface.register_factory(Engine, create_once=True)
+
+    with pytest.raises(UnfillableArgumentError):
+        interface.get(Engine)
+
+    errors = []
+
+    def resolve():
+        try:
+            interface.get(Engine)
+        except UnfillableArgumentError as e:
+            errors.append(e)
+
+    # A daemon, so a build left claimed fails the test rather than hang it
+    thread = threading.Thread(target=resolve, daemon=True)
+    thread.start()
+    thread.join(timeout=1)
+
+    assert len(errors) == 1
+
+
+@pytest.mark.anyio
+async def test_resolving_container_unfillable_factories_fail_across_tasks():
+    class Engine:
+        def __init__(self, dsn: str): ...
+
+    class Session:
+        def __init__(self, dsn: str): ...
+
+    interface = ResolvingContainer()
+    interface.register_factory(Engine, create_once=True)
+    interface.register_factory(Session)
+
+    async def resolve(key: type, scope: Scope | None):
+        with pytest.raises(UnfillableArgumentError):
+            await interface.aget(key, scope)
+
+    with anyio.fail_after(1):
+        async with Scope() as scope:
+            for key, scope_ in [(Engine, None), (Session, scope)]:
+                for _ in range(2):
+                    async with anyio.create_task_group() as tg:
+                        tg.start_soon(resolve, key, scope_)
@@ -0,0 +1,106 @@
+import pytest
+
+from dipin.container import Container
+from dipin.resolver import Resolver
+from dipin.scope import Scope
+
+
+class Connection: ...
+
+
+class Session:
+    def __init__(self, connection: Connection):
+        self.connection = connection
+
+
+@pytest.mark.anyio
+async def test_scope_tears_down_generator_factories_in_reverse_order():
+    events = []
+
+    def create_connection():
+        events.append("open connection")
+        yield Connection()
+        events.append("close connection")
+
+    async def create_session(connection: Connection):
+        events.append("open session")
+        yield Session(connection)
+        events.append("close session")
+
+    container = Container()
+    container.register_factory(Connection, create_connection)
+    container.register_factory(Session, create_session)
+
+    resolver = Resolver(container)
+
+    async with Scope() as scope:
+        session = await resolver.aget((Session, None), scope)
+        assert isinstance(session.connection, Connection)
+        assert events == ["open connection", "open session"]
+
+    assert events == [
+        "open connection",
+        "open session",
+        "close session",
+        "close connection",
+    ]
+
+
+@pytest.mark.anyio
+async def test_scope_builds_each_factory_once():
+    container = Container()
+    container.register_factory(Connection)
+    container.register_factory(Session)
+
+    resolver = Resolver(container)
+
+    async with Scope() as scope:
+        session = await resolver.aget((Session, None), scope)
+        connection = await resolver.aget((Connection, None), scope)
+        assert session.connection is connection
+
+    async with Scope() as scope:
+        assert await resolver.aget((Connection, None), scope) is not connection
+
+
+@pytest.mark.anyio
+async def test_scope_does_not_tear_down_cached_factories():
+    events = []
+
+    def create_connection():
+        yield Connection()
+        events.append("close connection")
+
+    container = Container()
+    container.register_factory(Connection, create_connection, create_once=True)
+
+    resolver = Resolver(container)
+
+    async with Scope() as scope:
+        await resolver.aget((Connection, None), scope)
+
+    assert events == []
+
+
+@pytest.mark.anyio
+async def test_scope_passes_errors_to_generator_factories():
+    errors = []
+
+    def create_connection():
+        try:
+            yield Connection()
+        except ValueError as e:
+            errors.append(e)
+            raise
+
+    container = Container()
+    container.register_factory(Connection, create_connection)
+
+    resolver = Resolver(container)
+
+    with pytest.raises(ValueError):
+        async with Scope() as scope:
+            await resolver.aget((Connection, None), scope)
+            raise ValueError("Request failed")
+
+    assert len(errors) == 1
@@ -0,0 +1,173 @@
+import anyio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from dipin.cache import TTL
+from dipin.interface import FastAPIContainer, ResolvingContainer
+
+
+class Settings: ...
+
+
+class Engine:
+    def __init__(self, settings: Settings):
+        self.settings = settings
+
+
+class Client:
+    def __init__(self):
+        self.closed = False
+
+    async def aclose(self):
+        self.closed = True
+
+
+class Pool:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.mark.anyio
+async def test_aclose_tears_down_dependents_before_their_dependencies():
+    closed = []
+
+    def create_settings():
+        yield Settings()
+        closed.append(Settings)
+
+    async def create_engine(settings: Settings):
+        yield Engine(settings)
+        closed.append(Engine)
+
+    DI = ResolvingContainer()
+    DI.register_factory(Settings, create_settings, create_once=True)
+    DI.register_factory(Engine, create_engine, create_once=True)
+
+    engine = await DI.aget(Engine)
+    assert closed == []
+
+    await DI.aclose()
+
+    assert closed == [Engine, Settings]
+    assert DI.container.finalizers == {}
+    assert await DI.aget(Engine) is not engine
+
+
+@pytest.mark.anyio
+async def test_aclose_closes_cached_instances_but_not_registered_ones():
+    DI = ResolvingContainer()
+    DI.register_factory(Client, create_once=True)
+    DI.register_factory(Pool, create_once=True)
+    registered = Pool()
+    DI.register_instance(registered, name="registered")
+
+    client = DI.get(Client)
+    pool = await DI.aget(Pool)
+    await DI.aclose()
+
+    assert client.closed
+    assert pool.closed
+    assert not registered.closed
+
+
+@pytest.mark.anyio
+async def test_aclose_closes_instances_cached_by_policies():
+    DI = ResolvingContainer()
+    DI.register_factory(Pool, cache=TTL(60))
+
+    pool = await DI.aget(Pool)
+    await DI.aclose()
+
+    assert pool.closed
+
+
+@pytest.mark.anyio
+async def test_child_aclose_only_tears_down_its_own_instances():
+    DI = ResolvingContainer()
+    DI.register_factory(Pool, cache=TTL(60))
+    DI.register_factory(Client, create_once=True)
+    pool = DI.get(Pool)
+
+    child = DI.child()
+    child.register_factory(Pool, name="child", cache=TTL(60))
+    child_pool = child.get("child")
+    client = child.get(Client)
+
+    await child.aclose()
+    assert child_pool.closed
+    assert not pool.closed
+    assert not client.closed
+    assert DI.get(Pool) is pool
+
+    await DI.aclose()
+    assert pool.closed
+    assert client.closed
+
+
+@pytest.mark.anyio
+async def test_aclose_tears_down_independent_instances_concurrently():
+    closing = anyio.Event()
+    closed = []
+
+    def create(name: str, wait: bool):
+        async def factory():
+            yield name
+            if wait:
+                await closing.wait()
+            else:
+                closing.set()
+            closed.append(name)
+
+        return factory
+
+    DI = ResolvingContainer()
+    DI.register_factory(str, create("a", wait=True), name="a", create_once=True)
+    DI.register_factory(str, create("b", wait=False), name="b", create_once=True)
+    await DI.aget("a")
+    await DI.aget("b")
+
+    with anyio.fail_after(1):
+        await DI.aclose()
+
+    assert closed == ["b", "a"]
+
+
+@pytest.mark.anyio
+async def test_aclose_logs_failed_teardowns_and_continues(
+    caplog: pytest.LogCaptureFixture,
+):
+    def create_settings():
+        yield Settings()
+        raise RuntimeError("Failed")
+
+    DI = ResolvingContainer()
+    DI.register_factory(Settings, create_settings, create_once=True)
+    DI.register_factory(Pool, create_once=True)
+    DI.get(Settings)
+    pool = DI.get(Pool)
+
+    await DI.aclose()
+
+    assert pool.closed
+    assert "Failed to tear down" in caplog.text
+
+
+def test_fastapi_lifespan_tears_down_cached_instances_on_shutdown():
+    DI = FastAPIContainer()
+    DI.register_factory(Client, create_once=True)
+
+    app = FastAPI(lifespan=DI.lifespan)
+
+    @app.get("/")
+    async def test(client: DI[Client]):
+        return client.closed
+
+    with TestClient(app) as test_client:
+        client = DI.get(Client)
+        assert test_client.get("/").json() is False
+
+    assert client.closed
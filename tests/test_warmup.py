@@ -0,0 +1,141 @@
+import time
+
+import anyio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from dipin.container import FrozenContainerError
+from dipin.interface import FastAPIContainer, ResolvingContainer
+
+
+class Settings: ...
+
+
+class Engine:
+    def __init__(self, settings: Settings):
+        self.settings = settings
+
+
+class Redis:
+    def __init__(self, settings: Settings):
+        self.settings = settings
+
+
+def test_warmup_constructs_create_once_factories_in_dependency_order():
+    DI = ResolvingContainer()
+    created = []
+
+    def create(type_):
+        def factory(settings: Settings):
+            created.append(type_)
+            return type_(settings)
+
+        return factory
+
+    DI.register_factory(Engine, create(Engine), create_once=True)
+    DI.register_factory(
+        Settings, lambda: created.append(Settings) or Settings(), create_once=True
+    )
+
+    timings = DI.warmup()
+
+    assert created == [Settings, Engine]
+    assert set(timings) == {(Settings, None), (Engine, None)}
+    assert DI.get(Engine).settings is DI.get(Settings)
+    assert created == [Settings, Engine]
+
+
+def test_warmup_skips_uncached_factories():
+    DI = ResolvingContainer()
+    DI.register_factory(Settings)
+
+    assert DI.warmup() == {}
+
+
+@pytest.mark.anyio
+async def test_async_warmup_constructs_independent_factories_concurrently():
+    DI = ResolvingContainer()
+
+    def slow_factory(type_):
+        async def factory(settings: Settings):
+            await anyio.sleep(0.1)
+            return type_(settings)
+
+        return factory
+
+    DI.register_factory(Settings, create_once=True)
+    DI.register_factory(Engine, slow_factory(Engine), create_once=True)
+    DI.register_factory(Redis, slow_factory(Redis), create_once=True)
+
+    started = time.perf_counter()
+    timings = await DI.awarmup()
+    elapsed = time.perf_counter() - started
+
+    assert set(timings) == {(Settings, None), (Engine, None), (Redis, None)}
+    assert elapsed < 0.19
+
+
+def test_frozen_container_rejects_registrations():
+    DI = ResolvingContainer()
+    DI.register_factory(Settings, create_once=True)
+    DI.warmup()
+    DI.freeze()
+
+    assert (Settings, None) in DI.container.singletons
+
+    with pytest.raises(FrozenContainerError):
+        DI.register_factory(Engine)
+
+
+def test_fastapi_lifespan_warms_and_freezes_container():
+    DI = FastAPIContainer()
+    created = 0
+
+    def create_settings() -> Settings:
+        nonlocal created
+        created += 1
+        return Settings()
+
+    DI.register_factory(Settings, create_settings, create_once=True)
+
+    app = FastAPI(lifespan=DI.lifespan)
+
+    @app.get("/")
+    async def test(settings: DI[Settings]):
+        return id(settings)
+
+    with TestClient(app) as test_client:
+        assert created == 1
+        assert DI.container.frozen
+
+        assert test_client.get("/").json() == id(DI.get(Settings))
+        assert created == 1
+
+
+def test_fastapi_lifespan_autowires_dependencies_once_frozen():
+    class Repository:
+        def __init__(self, settings: Settings):
+            self.settings = settings
+
+    class Handler:
+        def __init__(self, repository: Repository):
+            self.repository = repository
+
+    DI = FastAPIContainer()
+    DI.register_factory(Settings, create_once=True)
+
+    app = FastAPI(lifespan=DI.lifespan)
+
+    @app.get("/")
+    async def test(handler: DI[Handler]):
+        return id(handler.repository.settings)
+
+    with TestClient(app) as test_client:
+        # Only Handler is autowired before the container is frozen
+        assert (Repository, None) not in DI.container
+        assert test_client.get("/").json() == id(DI.get(Settings))
+        assert (Repository, None) in DI.container
+
+        with pytest.raises(FrozenContainerError):
+            DI.register_factory(Engine)